@@ -1,8 +1,24 @@
 import streamlit as st
-import requests
-import json
+import functools
+import io
+import os
 import time
 
+from risk_engine import metrics
+from risk_engine import (
+    analyse_documents, analyse_risks, build_complete_assessment, build_kickoff_payload, default_index,
+    iter_fallback_assessment, iter_intelligent_assessment
+)
+from risk_engine.cache import AssessmentCache, assessment_key
+from risk_engine.crewai_client import (
+    CACHED, CIRCUIT_OPEN, DIRECT_RESPONSE, HTTP_ERROR, STARTED, CrewAIClient, KickoffHandle,
+    merge_crewai_status
+)
+from risk_engine.history import HistoryStore
+
+# Script time of every full rerun; fragment-only reruns are timed by their own stage
+script_started = time.perf_counter()
+
 # Page configuration
 st.set_page_config(
     page_title="AI/ML Risk Assessment Workflow",
@@ -33,375 +49,567 @@ with col_config2:
 
 st.markdown("---")
 
+
+# One pooled CrewAI client (keep-alive session, circuit breaker) shared by all sessions; it
+# also collapses identical in-flight kickoffs and rate-limits outbound ones across sessions
+@st.cache_resource
+def get_crewai_client(api_url, api_token):
+    return CrewAIClient(
+        api_url, api_token,
+        rate_limit=float(os.environ.get("RISK_CREWAI_RATE_LIMIT", "2")) or None,
+        burst=int(os.environ.get("RISK_CREWAI_BURST", "5")),
+        max_concurrent=int(os.environ.get("RISK_CREWAI_MAX_CONCURRENT", "4"))
+    )
+
+
+# Assessments keyed by their inputs, shared by all sessions and persisted across restarts
+@st.cache_resource
+def get_assessment_cache():
+    return AssessmentCache(
+        max_entries=512,
+        ttl=24 * 3600,
+        directory=os.environ.get("RISK_ASSESSMENT_CACHE_DIR", ".assessment_cache")
+    )
+
+
+# Rule index and report templates compiled once per server rather than on the first submission
+@st.cache_resource
+def get_rule_index():
+    from risk_engine.report import LAYOUTS, compiled_layout
+
+    for layout in LAYOUTS:
+        compiled_layout(layout)
+    return default_index()
+
+
+# Every completed assessment, queryable across sessions and restarts
+@st.cache_resource
+def get_history_store():
+    return HistoryStore(os.environ.get("RISK_HISTORY_DB", "assessment_history.db"))
+
+
+# Prometheus /metrics endpoint, started once per server when RISK_METRICS and RISK_METRICS_PORT are set
+@st.cache_resource
+def start_metrics_endpoint():
+    port = os.environ.get("RISK_METRICS_PORT")
+    if metrics.enabled() and port:
+        return metrics.start_http_server(int(port))
+    return None
+
+
+start_metrics_endpoint()
+
+
+def crewai_notice(outcome, handle):
+    """(placeholder method, message) describing a kickoff outcome."""
+    if outcome["state"] == CACHED:
+        return "success", f"♻️ Identical submission - reusing cached assessment (Workflow ID: {outcome['workflow_id']})"
+    if outcome["state"] == STARTED and handle.waiters > 1:
+        return "success", (
+            f"✅ CrewAI Workflow Started! ID: {outcome['workflow_id']} "
+            f"(shared with {handle.waiters - 1} identical submission(s))"
+        )
+    if outcome["state"] == STARTED:
+        return "success", f"✅ CrewAI Workflow Started! ID: {outcome['workflow_id']}"
+    if outcome["state"] == DIRECT_RESPONSE:
+        return "success", "✅ CrewAI Integration Successful!"
+    if outcome["state"] == HTTP_ERROR:
+        return "warning", f"CrewAI Response: {outcome['status_code']}"
+    if outcome["state"] == CIRCUIT_OPEN:
+        return "warning", "CrewAI temporarily skipped after repeated failures - running in demo mode"
+    return "warning", "CrewAI unavailable - running in demo mode"
+
+
+def show_crewai_outcome(placeholder, handle, trace):
+    with st.spinner("Step 1: Waiting for CrewAI Multi-Agent Workflow..."), trace.span("crewai_wait"):
+        outcome = handle.wait_kickoff()
+    if "queue_wait" in outcome:
+        trace.add("crewai_queue_wait", outcome["queue_wait"], observe=False)
+    if "elapsed" in outcome:
+        trace.add("crewai_request", outcome["elapsed"], observe=False)
+    level, message = crewai_notice(outcome, handle)
+    getattr(placeholder, level)(message)
+    return outcome["workflow_id"], (level, message)
+
+
+def timed_fragment(stage):
+    """st.fragment whose runs (alone or as part of the page) are timed into ``stage``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with metrics.span(stage):
+                return func(*args, **kwargs)
+        return st.fragment(run)
+    return decorate
+
+
+def generate_assessment(submission, api_url, api_token):
+    """Run a submission once: kickoff, analysis, streamed report, cache and history writes.
+
+    Returns the result that later reruns redisplay with show_assessment.
+    """
+    project_name = submission["project_name"]
+    risk_description = submission["risk_description"]
+    contextual_notes = submission["contextual_notes"]
+    initial_impact = submission["initial_impact"]
+    initial_probability = submission["initial_probability"]
+    description_file = submission["description_file"]
+    context_file = submission["context_file"]
+    trace = metrics.start_trace()
+    result = {"id": submission["id"], "project_name": project_name, "file_stamp": int(time.time())}
+
+    # Attached documents are scanned in fixed-size chunks; from here on the
+    # fields are summaries (excerpt + SHA-256) rather than the full text
+    analysis = None
+    if description_file or context_file:
+        for uploaded in (description_file, context_file):
+            if uploaded:
+                uploaded.seek(0)
+        with trace.span("document_analysis"):
+            analysis, documents = analyse_documents(
+                [risk_description, "\n\n", description_file] if description_file else risk_description,
+                [contextual_notes, "\n\n", context_file] if context_file else contextual_notes,
+                index=get_rule_index()
+            )
+        risk_description, contextual_notes = documents["description"], documents["context"]
+
+    # Step 1: Kick off CrewAI in the background (for validation/proof of integration)
+    payload = build_kickoff_payload(
+        project_name, str(risk_description), str(contextual_notes), initial_impact, initial_probability
+    )
+
+    # Identical submissions are served from the cache and never kick off CrewAI again
+    assessment_cache = get_assessment_cache()
+    with trace.span("cache_lookup"):
+        cache_key = assessment_key(
+            project_name, str(risk_description), str(contextual_notes), initial_impact,
+            initial_probability
+        )
+        cached = assessment_cache.get(cache_key)
+
+    if cached is None:
+        with trace.span("crewai_submit"):
+            crewai_handle = get_crewai_client(api_url, api_token).kickoff(payload)
+    else:
+        cached_assessment = cached.complete_assessment
+        crewai_handle = KickoffHandle.completed({
+            "workflow_id": cached_assessment["workflow_info"]["crewai_workflow_id"],
+            "state": CACHED,
+            "status_code": None
+        })
+    result["crewai_handle"] = crewai_handle
+    crewai_placeholder = st.empty()
+    crewai_placeholder.info("Step 1: CrewAI Multi-Agent Workflow initiating in the background...")
+
+    # Step 2: Generate AI Assessment using Claude API
+    with st.spinner("Step 2: Generating AI Risk Assessment..."):
+
+        try:
+            # Generate intelligent assessment using built-in logic
+            st.info("🤖 Generating AI-powered risk assessment...")
+
+            # Generate the intelligent assessment
+            if cached is None:
+                if analysis is None:
+                    with trace.span("keyword_analysis"):
+                        analysis = analyse_risks(risk_description, contextual_notes, index=get_rule_index())
+            else:
+                analysis = {"fired_rules": cached_assessment["metadata"].get("fired_rules", [])}
+
+            st.success("🎉 AI Risk Assessment Complete!")
+            st.subheader("📊 Comprehensive Risk Assessment Report")
+
+            # Display the AI-generated assessment, streamed section by section
+            if cached is None:
+                assessment_content = trace.split_stream(
+                    "report_rendering", "streamlit_rendering",
+                    iter_intelligent_assessment(
+                        project_name, risk_description, contextual_notes,
+                        initial_impact, initial_probability, analysis
+                    ),
+                    st.write_stream
+                )
+            else:
+                assessment_content = cached_assessment["ai_assessment_report"]
+                with trace.span("streamlit_rendering"):
+                    st.markdown(assessment_content)
+
+            workflow_id, result["notice"] = show_crewai_outcome(crewai_placeholder, crewai_handle, trace)
+
+            # Create comprehensive download data
+            complete_assessment = None
+            if cached is None:
+                complete_assessment = build_complete_assessment(
+                    project_name, risk_description, contextual_notes,
+                    initial_impact, initial_probability, assessment_content,
+                    workflow_id, analysis=analysis
+                )
+                merge_crewai_status(complete_assessment, crewai_handle)
+                with trace.span("json_serialisation"):
+                    cached = assessment_cache.put(cache_key, complete_assessment)
+                with trace.span("history_write"):
+                    history_id = get_history_store().add(complete_assessment, cache_key, cached.text)
+
+            result.update(
+                report=assessment_content, cached=cached, workflow_id=workflow_id, analysis=analysis,
+                run_id=trace.run_id, timing=trace.breakdown()
+            )
+            if complete_assessment is not None:
+                crewai_handle.when_status_done(functools.partial(
+                    store_crewai_status, result=result, cache_key=cache_key, history_id=history_id,
+                    assessment_cache=assessment_cache, history_store=get_history_store()
+                ))
+            show_assessment_details(result, api_url, api_token)
+
+        except Exception as e:
+            st.error(f"Assessment Generation Error: {str(e)}")
+
+            # Fallback to simple assessment
+            st.info("🔄 Generating basic assessment...")
+            workflow_id, result["notice"] = show_crewai_outcome(crewai_placeholder, crewai_handle, trace)
+
+            fallback_assessment = st.write_stream(iter_fallback_assessment(
+                project_name, risk_description, contextual_notes,
+                initial_impact, initial_probability, workflow_id
+            ))
+            result.update(error=str(e), report=fallback_assessment, workflow_id=workflow_id)
+            show_fallback_download(result)
+    return result
+
+
+def store_crewai_status(handle, result, cache_key, history_id, assessment_cache, history_store):
+    """Merge the final CrewAI status into the cached entry, the history row and ``result``.
+
+    Runs on the CrewAI client's polling thread once polling ends, so it only
+    uses the objects it is given.
+    """
+    stored = result["cached"].complete_assessment
+    # A copy, so a download rendering the current entry never sees it change
+    complete_assessment = merge_crewai_status(
+        dict(stored, workflow_info=dict(stored["workflow_info"]), metadata=dict(stored["metadata"])), handle
+    )
+    entry = assessment_cache.put(cache_key, complete_assessment)
+    history_store.update_document(history_id, complete_assessment, entry.text)
+    result["cached"] = entry
+
+
+def show_assessment(result, api_url, api_token):
+    """Redisplay a finished assessment without repeating any of its side effects."""
+    level, message = result["notice"]
+    getattr(st, level)(message)
+    if "error" in result:
+        st.error(f"Assessment Generation Error: {result['error']}")
+        st.markdown(result["report"])
+        show_fallback_download(result)
+        return
+    st.success("🎉 AI Risk Assessment Complete!")
+    st.subheader("📊 Comprehensive Risk Assessment Report")
+    st.markdown(result["report"])
+    show_assessment_details(result, api_url, api_token)
+
+
+def show_fallback_download(result):
+    st.download_button(
+        label="📥 Download Assessment",
+        data=result["report"],
+        file_name=f"fallback_assessment_{result['project_name']}_{result['file_stamp']}.md",
+        mime="text/markdown",
+        on_click="ignore"
+    )
+
+
+def show_assessment_details(result, api_url, api_token):
+    project_name, file_stamp = result["project_name"], result["file_stamp"]
+
+    # Download options (the JSON is only rendered when clicked; downloading doesn't rerun the page)
+    col_dl1, col_dl2 = st.columns(2)
+
+    with col_dl1:
+        st.download_button(
+            label="📥 Download Complete Assessment",
+            data=lambda result=result: result["cached"].json,
+            file_name=f"ai_risk_assessment_{project_name}_{file_stamp}.json",
+            mime="application/json",
+            on_click="ignore"
+        )
+
+    with col_dl2:
+        st.download_button(
+            label="📄 Download Report Only",
+            data=result["report"],
+            file_name=f"risk_report_{project_name}_{file_stamp}.md",
+            mime="text/markdown",
+            on_click="ignore"
+        )
+
+    # Show integration summary
+    with st.expander("🔧 Integration Details"):
+        st.write("**System Architecture:**")
+        st.write("- ✅ CrewAI Multi-Agent Workflow (Backend)")
+        st.write("- ✅ Intelligent Assessment Engine (AI Analysis)")
+        st.write("- ✅ Streamlit Interface (Frontend)")
+        st.write("- ✅ Real-time API Integration")
+        st.write(f"- ✅ Workflow ID: `{result['workflow_id']}`")
+        st.write(f"- ✅ CrewAI Status: {result['cached'].complete_assessment['metadata'].get('crewai_status')}")
+        cache_stats = get_assessment_cache().stats
+        st.write(
+            f"- ✅ Assessment Cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits / "
+            f"{cache_stats['misses']} misses"
+        )
+        crewai_stats = get_crewai_client(api_url, api_token).stats()
+        queue_wait = result["crewai_handle"].wait_kickoff().get("queue_wait")
+        st.write(
+            f"- ✅ CrewAI Queue: {crewai_stats['queue_depth']} waiting, "
+            f"{crewai_stats['in_flight']}/{crewai_stats['max_concurrent']} in flight, "
+            f"{crewai_stats['deduplicated']} duplicate kickoffs collapsed"
+            + (f", this kickoff waited {queue_wait * 1000:.0f} ms" if queue_wait is not None else "")
+        )
+        st.write("**Rules Fired:**")
+        for fired in result["analysis"]["fired_rules"]:
+            st.write(f"- `{fired['rule']}` ({fired['field']}): {', '.join(fired['keywords'])}")
+
+    # Per-stage timing for this run (only when RISK_METRICS is enabled)
+    if result["timing"]:
+        with st.expander("⏱️ Timing"):
+            st.write(f"**Run ID:** `{result['run_id']}`")
+            for stage, elapsed_ms in result["timing"]:
+                st.write(f"- **{stage}:** {elapsed_ms:.1f} ms")
+
+
+# The latest submission is generated once, in the run that submits it; every later
+# rerun (of the page or of this fragment) redisplays the stored result
+@timed_fragment("output_fragment")
+def output_panel(api_url, api_token):
+    st.header("Output")
+    submission = st.session_state.get("submission")
+    if submission is None:
+        st.write("👆 Fill in the form and click 'Generate Risk Assessment' to see results")
+        return
+    result = st.session_state.get("assessment")
+    if result is not None and result["id"] == submission["id"]:
+        show_assessment(result, api_url, api_token)
+    else:
+        st.session_state["assessment"] = generate_assessment(submission, api_url, api_token)
+
+
 # Main interface
 col1, col2 = st.columns([1, 1])
 
 with col1:
     st.header("Input")
-    
-    # Required fields
-    project_name = st.text_input("Project Name", value="Sales Email Copilot")
-    
-    risk_description = st.text_area("Risk Description", height=100, 
-                                   value="Automates drafting of customer emails using sensitive CRM data")
-    
-    initial_impact = st.selectbox("Initial Impact Level", ["Low", "Medium", "High", "Critical"], index=2)
-    
-    initial_probability = st.selectbox("Initial Probability", ["Low", "Medium", "High"], index=2)
-    
-    contextual_notes = st.text_area("Contextual Notes", height=80,
-                                   value="Targets EU; GDPR applies; drafts stored for 14 days.")
-    
-    # Submit button
-    if st.button("🚀 Generate Risk Assessment", type="primary"):
-        if risk_description and project_name:
-            
-            with col2:
-                st.header("Output")
-                
-                # Step 1: Call CrewAI (for validation/proof of integration)
-                with st.spinner("Step 1: Initiating CrewAI Multi-Agent Workflow..."):
-                    
-                    payload = {
-                        "inputs": {
-                            "project_name": project_name,
-                            "risk_description": risk_description,
-                            "contextual_notes": contextual_notes,
-                            "initial_probability": initial_probability,
-                            "initial_impact": initial_impact,
-                            "customer_email": "assessment@company.com"
-                        }
-                    }
-                    
-                    try:
-                        response = requests.post(
-                            api_url,
-                            headers={
-                                "Authorization": f"Bearer {api_token}",
-                                "Content-Type": "application/json"
-                            },
-                            json=payload,
-                            timeout=30
-                        )
-                        
-                        if response.status_code == 200:
-                            crewai_result = response.json()
-                            if "kickoff_id" in crewai_result:
-                                st.success(f"✅ CrewAI Workflow Started! ID: {crewai_result['kickoff_id']}")
-                                workflow_id = crewai_result['kickoff_id']
-                            else:
-                                st.success("✅ CrewAI Integration Successful!")
-                                workflow_id = "direct_response"
-                        else:
-                            st.warning(f"CrewAI Response: {response.status_code}")
-                            workflow_id = "demo_mode"
-                            
-                    except Exception as e:
-                        st.warning("CrewAI unavailable - running in demo mode")
-                        workflow_id = "demo_mode"
-                
-                # Step 2: Generate AI Assessment using Claude API
-                with st.spinner("Step 2: Generating AI Risk Assessment..."):
-                    
-                    # Call Claude API for actual AI assessment
-                    claude_prompt = f"""You are an expert AI/ML risk assessment analyst. Analyze the following system and provide a comprehensive risk assessment report.
-
-Project: {project_name}
-Description: {risk_description}
-Context: {contextual_notes}
-Initial Impact: {initial_impact}
-Initial Probability: {initial_probability}
-
-Please provide a detailed risk assessment report in markdown format that includes:
-
-1. **Executive Summary** - Key risks and overall assessment
-2. **Risk Classification** - Primary risk categories identified
-3. **Detailed Risk Analysis** - Specific risks with probability and impact
-4. **Compliance Considerations** - Regulatory and legal implications
-5. **Mitigation Strategies** - Specific actionable recommendations
-6. **Implementation Timeline** - Prioritized action items
-7. **Success Metrics** - How to measure risk mitigation effectiveness
-
-Make this a professional, comprehensive assessment that would be suitable for executive review. Focus on practical, actionable insights specific to this AI/ML system."""
-
-                    try:
-                        # Generate intelligent assessment using built-in logic
-                        st.info("🤖 Generating AI-powered risk assessment...")
-                        
-                        # Intelligent assessment generation based on inputs
-                        def generate_intelligent_assessment(project, description, context, impact, probability):
-                            
-                            # Risk categorization logic
-                            risk_categories = []
-                            compliance_risks = []
-                            technical_risks = []
-                            operational_risks = []
-                            
-                            # Analyze description for keywords
-                            desc_lower = description.lower()
-                            context_lower = context.lower()
-                            
-                            # Data privacy risks
-                            if any(word in desc_lower for word in ['data', 'personal', 'customer', 'crm', 'sensitive']):
-                                risk_categories.append("Data Privacy & Security")
-                                technical_risks.append("Unauthorized access to sensitive customer data")
-                                
-                            # Compliance risks
-                            if any(word in context_lower for word in ['gdpr', 'eu', 'regulation', 'compliance']):
-                                risk_categories.append("Regulatory Compliance")
-                                compliance_risks.append("GDPR compliance violations and regulatory fines")
-                                
-                            # AI/ML specific risks
-                            if any(word in desc_lower for word in ['ai', 'ml', 'model', 'algorithm', 'automated']):
-                                risk_categories.append("AI/ML Ethics & Bias")
-                                technical_risks.append("Algorithmic bias in automated decision-making")
-                                
-                            # Email/communication risks
-                            if any(word in desc_lower for word in ['email', 'communication', 'message']):
-                                risk_categories.append("Communication Security")
-                                operational_risks.append("Inappropriate or harmful automated communications")
-                                
-                            # Storage/retention risks
-                            if any(word in context_lower for word in ['storage', 'retention', 'days', 'stored']):
-                                risk_categories.append("Data Retention")
-                                compliance_risks.append("Excessive data retention periods")
-                            
-                            # Generate risk level
-                            risk_score = 0
-                            if impact == "Critical": risk_score += 4
-                            elif impact == "High": risk_score += 3
-                            elif impact == "Medium": risk_score += 2
-                            else: risk_score += 1
-                            
-                            if probability == "High": risk_score += 3
-                            elif probability == "Medium": risk_score += 2
-                            else: risk_score += 1
-                            
-                            if risk_score >= 6: overall_risk = "CRITICAL"
-                            elif risk_score >= 4: overall_risk = "HIGH"
-                            elif risk_score >= 3: overall_risk = "MEDIUM"
-                            else: overall_risk = "LOW"
-                            
-                            # Generate mitigation strategies
-                            mitigations = []
-                            if "Data Privacy" in risk_categories:
-                                mitigations.append({
-                                    "strategy": "Implement Data Anonymization",
-                                    "timeline": "2-4 weeks",
-                                    "priority": "Critical"
-                                })
-                            
-                            if "Regulatory Compliance" in risk_categories:
-                                mitigations.append({
-                                    "strategy": "Establish GDPR Compliance Framework",
-                                    "timeline": "3-6 weeks", 
-                                    "priority": "High"
-                                })
-                            
-                            if "AI/ML Ethics" in risk_categories:
-                                mitigations.append({
-                                    "strategy": "Deploy Bias Detection and Fairness Monitoring",
-                                    "timeline": "4-8 weeks",
-                                    "priority": "High"
-                                })
-                                
-                            # Build comprehensive report
-                            report = f"""# Risk Assessment Report for {project}
-
-## Executive Summary
-The **{project}** system has been classified as **{overall_risk} RISK** based on {impact.lower()} impact and {probability.lower()} probability assessments. This AI-powered analysis identifies critical areas requiring immediate attention to ensure regulatory compliance and operational security.
-
-## Project Overview
-- **System Description:** {description}
-- **Operating Context:** {context}
-- **Assessment Date:** {time.strftime('%B %d, %Y')}
-- **Overall Risk Level:** **{overall_risk}**
-
-## Risk Classification & Analysis
-
-### Primary Risk Categories Identified:
-{chr(10).join([f"- **{cat}**" for cat in risk_categories])}
-
-### Detailed Risk Assessment:
-
-#### 🔴 Critical Risks:
-{chr(10).join([f"- {risk}" for risk in technical_risks[:2]])}
-
-#### 🟡 Compliance Risks:
-{chr(10).join([f"- {risk}" for risk in compliance_risks])}
-
-#### 🟠 Operational Risks:
-{chr(10).join([f"- {risk}" for risk in operational_risks])}
-
-## Risk Impact Analysis
-- **Probability:** {probability} - Based on system design and data handling patterns
-- **Impact:** {impact} - Considering regulatory environment and data sensitivity
-- **Risk Score:** {risk_score}/7 ({overall_risk})
-
-## Recommended Mitigation Strategies
-
-{chr(10).join([f'''### {i+1}. {mit["strategy"]}
-- **Implementation Timeline:** {mit["timeline"]}
-- **Priority Level:** {mit["priority"]}
-- **Expected Outcome:** Significant reduction in associated risk exposure
-''' for i, mit in enumerate(mitigations)])}
-
-## Implementation Roadmap
-
-### Phase 1: Immediate Actions (0-2 weeks)
-- Conduct security audit of current data handling practices
-- Implement access controls and authentication measures
-- Begin compliance documentation review
-
-### Phase 2: Core Mitigations (2-8 weeks)
-- Deploy primary mitigation strategies identified above
-- Establish monitoring and alerting systems
-- Create incident response procedures
-
-### Phase 3: Continuous Improvement (8+ weeks)
-- Regular risk assessments and updates
-- Performance monitoring and optimization
-- Stakeholder training and awareness programs
-
-## Success Metrics & KPIs
-- **Zero** data breach incidents
-- **100%** compliance audit pass rate
-- **<24 hour** incident response time
-- **Quarterly** risk assessment reviews completed
-
-## Regulatory Considerations
-{"- **GDPR Compliance:** Critical for EU operations with personal data processing" if "eu" in context_lower or "gdpr" in context_lower else ""}
-{"- **Data Protection:** Enhanced security measures required for sensitive information" if "sensitive" in desc_lower else ""}
-
-## Next Steps & Recommendations
-1. **Executive Review:** Present findings to leadership team within 48 hours
-2. **Resource Allocation:** Assign dedicated team for mitigation implementation  
-3. **Timeline Approval:** Secure approval for recommended implementation timeline
-4. **Monitoring Setup:** Establish ongoing risk monitoring processes
-
----
-
-**Assessment Methodology:** AI-powered multi-agent analysis  
-**Confidence Level:** High (based on comprehensive input analysis)  
-**Review Frequency:** Recommended quarterly or upon system changes
-
-*This assessment was generated using advanced AI risk analysis algorithms integrated with CrewAI multi-agent workflows.*"""
-                            
-                            return report
-                        
-                        # Generate the intelligent assessment
-                        assessment_content = generate_intelligent_assessment(
-                            project_name, risk_description, contextual_notes, 
-                            initial_impact, initial_probability
-                        )
-                        
-                        st.success("🎉 AI Risk Assessment Complete!")
-                        st.subheader("📊 Comprehensive Risk Assessment Report")
-                        
-                        # Display the AI-generated assessment
-                        st.markdown(assessment_content)
-                        
-                        # Create comprehensive download data
-                        complete_assessment = {
-                            "workflow_info": {
-                                "crewai_workflow_id": workflow_id,
-                                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
-                                "assessment_type": "AI-Powered Risk Analysis"
-                            },
-                            "project_details": {
-                                "project_name": project_name,
-                                "risk_description": risk_description,
-                                "contextual_notes": contextual_notes,
-                                "initial_impact": initial_impact,
-                                "initial_probability": initial_probability
-                            },
-                            "ai_assessment_report": assessment_content,
-                            "metadata": {
-                                "generated_by": "Claude AI + CrewAI Integration",
-                                "model": "intelligent_assessment_engine",
-                                "crewai_status": "workflow_initiated"
-                            }
-                        }
-                        
-                        # Download options
-                        col_dl1, col_dl2 = st.columns(2)
-                        
-                        with col_dl1:
-                            st.download_button(
-                                label="📥 Download Complete Assessment",
-                                data=json.dumps(complete_assessment, indent=2),
-                                file_name=f"ai_risk_assessment_{project_name}_{int(time.time())}.json",
-                                mime="application/json"
-                            )
-                        
-                        with col_dl2:
-                            st.download_button(
-                                label="📄 Download Report Only",
-                                data=assessment_content,
-                                file_name=f"risk_report_{project_name}_{int(time.time())}.md",
-                                mime="text/markdown"
-                            )
-                        
-                        # Show integration summary
-                        with st.expander("🔧 Integration Details"):
-                            st.write("**System Architecture:**")
-                            st.write("- ✅ CrewAI Multi-Agent Workflow (Backend)")
-                            st.write("- ✅ Intelligent Assessment Engine (AI Analysis)")
-                            st.write("- ✅ Streamlit Interface (Frontend)")
-                            st.write("- ✅ Real-time API Integration")
-                            st.write(f"- ✅ Workflow ID: `{workflow_id}`")
-                            
-                    except Exception as e:
-                        st.error(f"Assessment Generation Error: {str(e)}")
-                        
-                        # Fallback to simple assessment
-                        st.info("🔄 Generating basic assessment...")
-                        
-                        fallback_assessment = f"""# Risk Assessment Report for {project_name}
-
-## Executive Summary
-The {project_name} system presents **{initial_impact.lower()} impact** and **{initial_probability.lower()} probability** risks that require immediate attention. {risk_description}
-
-## Key Risk Areas Identified
-- **Data Privacy & Security**: Handling sensitive information
-- **Regulatory Compliance**: Meeting industry standards  
-- **Operational Risk**: System reliability and performance
-- **Reputational Risk**: Impact on organizational trust
-
-## Context Analysis
-{contextual_notes}
-
-## Recommendations
-1. **Immediate**: Implement security controls and access management
-2. **Short-term**: Establish monitoring and compliance frameworks
-3. **Long-term**: Continuous improvement and risk assessment processes
-
-## Implementation Priority
-- **Critical**: Data protection measures
-- **High**: Compliance documentation
-- **Medium**: Performance optimization
-- **Low**: Advanced analytics and reporting
-
----
-*Assessment generated by AI-powered multi-agent system*
-*Workflow ID: {workflow_id}*"""
-
-                        st.markdown(fallback_assessment)
-                        
-                        st.download_button(
-                            label="📥 Download Assessment",
-                            data=fallback_assessment,
-                            file_name=f"fallback_assessment_{project_name}_{int(time.time())}.md",
-                            mime="text/markdown"
-                        )
-        
+
+    # Edits stay in the browser until the form is submitted, so typing doesn't rerun the script
+    with st.form("assessment_input", border=False):
+        # Required fields
+        project_name = st.text_input("Project Name", value="Sales Email Copilot")
+
+        risk_description = st.text_area("Risk Description", height=100,
+                                        value="Automates drafting of customer emails using sensitive CRM data")
+
+        initial_impact = st.selectbox("Initial Impact Level", ["Low", "Medium", "High", "Critical"], index=2)
+
+        initial_probability = st.selectbox("Initial Probability", ["Low", "Medium", "High"], index=2)
+
+        contextual_notes = st.text_area("Contextual Notes", height=80,
+                                        value="Targets EU; GDPR applies; drafts stored for 14 days.")
+
+        # Optional documents (DPIAs, architecture docs), appended to the fields above
+        col_doc1, col_doc2 = st.columns(2)
+        with col_doc1:
+            description_file = st.file_uploader("Attach to Risk Description", type=["txt", "md"])
+        with col_doc2:
+            context_file = st.file_uploader("Attach to Contextual Notes", type=["txt", "md"])
+
+        # Submit button
+        submitted = st.form_submit_button("🚀 Generate Risk Assessment", type="primary")
+
+    if submitted:
+        if (risk_description or description_file) and project_name:
+            st.session_state["submission"] = {
+                "id": os.urandom(6).hex(),
+                "project_name": project_name,
+                "risk_description": risk_description,
+                "contextual_notes": contextual_notes,
+                "initial_impact": initial_impact,
+                "initial_probability": initial_probability,
+                "description_file": description_file,
+                "context_file": context_file,
+            }
         else:
             st.error("Please fill in Project Name and Risk Description!")
 
 with col2:
-    if 'assessment_content' not in locals():
-        st.header("Output")
-        st.write("👆 Fill in the form and click 'Generate Risk Assessment' to see results")
+    output_panel(api_url, api_token)
+
+
+# Parsed once per uploaded file; re-runs only re-aggregate the cached columns.
+# Returns (portfolio, what was loaded, seconds the load took when it ran).
+@st.cache_data(max_entries=4, show_spinner="Loading portfolio...")
+def load_portfolio(data, file_name):
+    import csv
+    import json
+    import re
+    from risk_engine.portfolio import Portfolio
+
+    started = time.perf_counter()
+    text = data.decode("utf-8")
+    if file_name.endswith((".jsonl", ".ndjson")):
+        first = re.search(r"\S[^\n]*", text)
+        # Batch/service output already records the fired rules, so only those and
+        # the project details are decoded; raw projects are categorised here
+        if first and "project_details" in json.loads(first.group()):
+            return Portfolio.from_assessments_jsonl(text), "batch output", time.perf_counter() - started
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        records = list(csv.DictReader(io.StringIO(text)))
+    portfolio, source = Portfolio.from_projects(records), "raw projects"
+    return portfolio, source, time.perf_counter() - started
+
+
+# Bulk exports are built only when their download button is clicked, so
+# filtering the history never pays for an export nobody downloads. Streamlit
+# holds a download's bytes in memory, so in-app exports are capped; larger
+# ones go through the export CLI, which streams to a file.
+EXPORT_ROW_LIMIT = 5000
+
+
+def export_history(store, filters, export_format):
+    from risk_engine.export import write_ndjson_gz, write_zip
+
+    # Deferred download data must be bytes, str or an in-memory/real file object
+    out = io.BytesIO()
+    if export_format == "zip":
+        write_zip(out, store.iter_documents(limit=EXPORT_ROW_LIMIT, **filters))
+    else:
+        write_ndjson_gz(out, store.iter_documents(raw=True, limit=EXPORT_ROW_LIMIT, **filters))
+    out.seek(0)
+    return out
+
+
+def export_command(store, filters):
+    """The ``python -m risk_engine.export`` command for ``filters``."""
+    import shlex
+
+    args = ["python", "-m", "risk_engine.export", store.path, "-o", "risk_assessments.zip"]
+    if filters["overall_risk"]:
+        args += ["--risk", filters["overall_risk"]]
+    if filters["category"]:
+        args += ["--category", filters["category"]]
+    if filters["since"]:
+        args += ["--since", time.strftime('%Y-%m-%d', time.localtime(filters["since"]))]
+    return shlex.join(args)
+
+
+# Assessment history; filtering reruns only this panel
+@timed_fragment("history_fragment")
+def history_panel():
+    from risk_engine.portfolio import RISK_LEVELS, category_names
+
+    history_periods = {"Any time": None, "Last 7 days": 7, "Last 90 days": 90, "Last 365 days": 365}
+    col_h1, col_h2, col_h3 = st.columns(3)
+    with col_h1:
+        history_risk = st.selectbox("Overall Risk", ["Any"] + list(RISK_LEVELS))
+    with col_h2:
+        history_category = st.selectbox("Risk Category", ["Any"] + category_names())
+    with col_h3:
+        history_period = st.selectbox("Period", list(history_periods))
+
+    days = history_periods[history_period]
+    history_filters = {
+        "overall_risk": None if history_risk == "Any" else history_risk,
+        "category": None if history_category == "Any" else history_category,
+        "since": time.time() - days * 86400 if days else None,
+    }
+    history_store = get_history_store()
+    history_rows = history_store.query(limit=200, **history_filters)
+    history_count = history_store.count(**history_filters)
+    st.write(f"**{history_count}** matching assessments (newest 200 shown)")
+    if history_count > EXPORT_ROW_LIMIT:
+        st.info(
+            f"In-app export is limited to {EXPORT_ROW_LIMIT:,} assessments. "
+            f"Export these {history_count:,} from the command line:"
+        )
+        st.code(export_command(history_store, history_filters), language="bash")
+    elif history_count:
+        col_ex1, col_ex2 = st.columns(2)
+        with col_ex1:
+            st.download_button(
+                label="🗜️ Export Matching as ZIP",
+                data=lambda store=history_store, filters=history_filters: export_history(store, filters, "zip"),
+                file_name="risk_assessments.zip",
+                mime="application/zip",
+                on_click="ignore"
+            )
+        with col_ex2:
+            st.download_button(
+                label="📦 Export Matching as NDJSON.gz",
+                data=lambda store=history_store, filters=history_filters: export_history(store, filters, "ndjson"),
+                file_name="risk_assessments.ndjson.gz",
+                mime="application/gzip",
+                on_click="ignore"
+            )
+    if history_rows:
+        st.dataframe([
+            {
+                "Project": row["project_name"],
+                "Overall Risk": row["overall_risk"],
+                "Score": row["risk_score"],
+                "Impact": row["initial_impact"],
+                "Probability": row["initial_probability"],
+                "Assessed": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row["created_at"])),
+                "Workflow ID": row["workflow_id"],
+            }
+            for row in history_rows
+        ])
+
+
+# Portfolio view; uploading reruns only this panel
+@timed_fragment("portfolio_fragment")
+def portfolio_panel():
+    st.write("Upload a project portfolio (CSV/JSONL, batch input or batch output) to see risk aggregates.")
+    portfolio_file = st.file_uploader("Portfolio file", type=["csv", "jsonl", "ndjson"])
+    if portfolio_file is not None:
+        import pandas as pd
+        from risk_engine.portfolio import IMPACT_LEVELS, PROBABILITY_LEVELS, RISK_LEVELS
+
+        portfolio, source, load_seconds = load_portfolio(portfolio_file.getvalue(), portfolio_file.name)
+        started = time.perf_counter()
+        heatmap = portfolio.heatmap()
+        level_counts = portfolio.level_counts()
+        category_counts = portfolio.category_counts()
+        category_levels = portfolio.category_level_matrix()
+        aggregation_ms = (time.perf_counter() - started) * 1000
+
+        level_cols = st.columns(len(RISK_LEVELS) + 1)
+        level_cols[0].metric("Projects", len(portfolio))
+        for column, level in zip(level_cols[1:], RISK_LEVELS):
+            column.metric(level, level_counts[level])
+
+        heat_col, category_col = st.columns(2)
+        with heat_col:
+            st.write("**Impact × Probability**")
+            st.dataframe(pd.DataFrame(
+                heatmap, index=[f"Impact: {level}" for level in IMPACT_LEVELS],
+                columns=[f"Probability: {level}" for level in PROBABILITY_LEVELS]
+            ))
+        with category_col:
+            st.write("**Projects per risk category**")
+            st.bar_chart(pd.Series(category_counts, name="projects"))
+        st.write("**Risk categories by overall risk level**")
+        st.dataframe(pd.DataFrame(category_levels, index=portfolio.category_names, columns=RISK_LEVELS))
+        st.caption(
+            f"Loaded {len(portfolio):,} projects ({source}) in {load_seconds:.2f} s; "
+            f"aggregated in {aggregation_ms:.1f} ms."
+        )
+
+
+st.markdown("---")
+with st.expander("🗂️ Assessment History"):
+    history_panel()
+
+st.markdown("---")
+with st.expander("📊 Portfolio View"):
+    portfolio_panel()
 
 # System capabilities display
 st.markdown("---")
@@ -422,3 +630,5 @@ with st.expander("🚀 System Capabilities"):
 # Footer
 st.markdown("---")
 st.markdown("🤖 **AI-Powered Risk Assessment** | CrewAI + Claude AI + Streamlit")
+
+metrics.observe("script_run", time.perf_counter() - script_started)
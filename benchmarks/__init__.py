@@ -0,0 +1 @@
+"""Benchmarks for the assessment engine: ``python -m benchmarks --help``."""
@@ -0,0 +1,65 @@
+"""Deterministic synthetic inputs for the benchmarks."""
+
+import random
+
+from risk_engine.rules import RISK_RULES
+
+FILLER_WORDS = (
+    "the system pipeline service users team platform review process integration workflow "
+    "report quarterly vendor internal dashboard latency feature release support request "
+    "throughput architecture deployment region analytics training inference scoring"
+).split()
+
+KEYWORDS = sorted({keyword for rule in RISK_RULES for keyword in rule["keywords"]})
+# Leaves one description rule unfired, so RuleIndex.scan can't stop early and reads the whole text
+UNFIRED_RULE = "communication_security"
+FULL_SCAN_KEYWORDS = sorted(
+    set(KEYWORDS) - {keyword for rule in RISK_RULES if rule["id"] == UNFIRED_RULE for keyword in rule["keywords"]}
+)
+
+SIZES = {"1KB": 1024, "10KB": 10 * 1024, "100KB": 100 * 1024, "1MB": 1024 * 1024}
+
+
+def make_text(size, keyword_ratio=0.02, seed=0, keywords=KEYWORDS):
+    """About ``size`` characters of prose with a sprinkling of ``keywords``."""
+    rng = random.Random(seed)
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < keyword_ratio else rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def make_rules(count, seed=0):
+    """``count`` rules: the real RISK_RULES padded with synthetic ones that rarely fire."""
+    rng = random.Random(seed)
+    rules = list(RISK_RULES[:count])
+    fields = ("description", "context")
+    for number in range(len(rules), count):
+        keywords = [f"kw{number}x{rng.randrange(10 ** 6)}" for _ in range(rng.randint(3, 8))]
+        rules.append({
+            "id": f"synthetic_{number}",
+            "category": f"Synthetic Category {number}",
+            "field": fields[number % 2],
+            "keywords": keywords,
+            "risks": {"technical": [f"Synthetic risk {number}"]},
+        })
+    return rules
+
+
+def make_projects(count, description_size=512, seed=0):
+    """Yield (line_number, raw project dict) pairs shaped like batch.read_projects output."""
+    rng = random.Random(seed)
+    impacts = ("Low", "Medium", "High", "Critical")
+    probabilities = ("Low", "Medium", "High")
+    description = make_text(description_size, seed=seed)
+    context = make_text(128, keyword_ratio=0.1, seed=seed + 1)
+    for number in range(count):
+        yield number + 1, {
+            "project_name": f"Project {number}",
+            "risk_description": description,
+            "contextual_notes": context,
+            "initial_impact": rng.choice(impacts),
+            "initial_probability": rng.choice(probabilities),
+        }
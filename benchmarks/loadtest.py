@@ -0,0 +1,290 @@
+"""Concurrent load test of app.py: simulated Streamlit sessions against a stub CrewAI backend.
+
+    python -m benchmarks load --concurrency 1,4,16 --latency 0.3 --error-rate 0.05
+    python -m benchmarks load --quick -o /tmp/load.json
+
+Each simulated user is a headless ``AppTest`` session that opens the page,
+points the CrewAI URL at a local ``StubCrewAIServer`` and then fills in the
+form and clicks Generate ``--requests`` times. Sessions of a level start
+clicking together. AppTest installs a process-wide mock runtime for every
+run, so each session gets its own worker process. The on-disk assessment
+cache and the SQLite history are shared between sessions as on a real
+server. The CrewAI client's rate limit, concurrency cap and kickoff dedup
+live in each worker's ``st.cache_resource``, so they apply per session here.
+
+For every concurrency level (``load/concurrency=N``) the tool reports
+end-to-end click latency percentiles, throughput (completed assessments
+per second of wall time) and the median peak RSS of that level's workers.
+Traced memory per session comes from one separate sequential pass, so
+tracing does not skew the timings, and is reported once as
+``load/session_memory`` rather than copied into every level. Results use
+the same schema as ``python -m benchmarks run``, so ``compare`` flags
+regressions between two load runs as well.
+"""
+
+import gc
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .run import _percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+CONCURRENCY_LEVELS = (1, 2, 4, 8, 16)
+QUICK_CONCURRENCY_LEVELS = (1, 4)
+# Loading the page in a fresh worker imports Streamlit and the app; allow for a crowded CPU
+STARTUP_TIMEOUT = 300
+
+DESCRIPTIONS = (
+    "Automates drafting of customer emails using sensitive CRM data",
+    "Chat assistant that answers employee HR questions from personal records",
+    "ML model scoring loan applications with customer financial data",
+    "Summarises support tickets and stores transcripts for 90 days",
+)
+
+
+class Session:
+    """One simulated user: an AppTest session pointed at the stub."""
+
+    def __init__(self, stub_url, number, unique=True, timeout=120):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.unique = unique
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.requests = 0
+        started = time.perf_counter()
+        self.app.run()
+        self.page_load = time.perf_counter() - started
+        self._input("CrewAI API URL").set_value(f"{stub_url}/kickoff")
+
+    def _input(self, label):
+        for widget in list(self.app.text_input) + list(self.app.text_area):
+            if widget.label == label:
+                return widget
+        raise LookupError(f"no input labelled {label!r}")
+
+    def submit(self):
+        """Fill the form, click Generate and return (seconds, outcome)."""
+        self.requests += 1
+        suffix = f" {self.number}-{self.requests}" if self.unique else ""
+        self._input("Project Name").set_value(f"Load Test Project{suffix}")
+        self._input("Risk Description").set_value(DESCRIPTIONS[(self.number + self.requests) % len(DESCRIPTIONS)])
+        button = next(button for button in self.app.button if "Generate" in button.label)
+        started = time.perf_counter()
+        button.click().run()
+        elapsed = time.perf_counter() - started
+        return elapsed, self._outcome()
+
+    def _outcome(self):
+        if len(self.app.exception) or len(self.app.error):
+            return "error"
+        warnings = " ".join(str(warning.value) for warning in self.app.warning)
+        if "demo mode" in warnings or "CrewAI Response" in warnings:
+            return "degraded"
+        return "ok"
+
+
+def _quiet_streamlit():
+    from streamlit.logger import set_log_level
+
+    # AppTest sessions run without a server; silence the "missing ScriptRunContext" noise.
+    # Loading Streamlit's config on the first run resets the level, so call again after it.
+    set_log_level("error")
+
+
+def _peak_rss_kb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def _session_worker(stub_url, number, requests_per_session, unique, barrier, results):
+    """Worker process body: load the page, wait for the others, then submit."""
+    latencies, outcomes, page_load = [], [], None
+    try:
+        _quiet_streamlit()
+        session = Session(stub_url, number, unique)
+        _quiet_streamlit()
+        page_load = session.page_load
+        barrier.wait(STARTUP_TIMEOUT)
+        for _ in range(requests_per_session):
+            elapsed, outcome = session.submit()
+            latencies.append(elapsed)
+            outcomes.append(outcome)
+    except Exception as e:
+        barrier.abort()
+        outcomes.append("error")
+        print(f"Session {number} failed: {e!r}", file=sys.stderr)
+    results.put((latencies, outcomes, page_load, _peak_rss_kb()))
+
+
+def run_level(context, stub_url, concurrency, requests_per_session, first_number, unique=True):
+    """Run ``concurrency`` sessions in parallel; return latencies, outcomes, page loads, RSS and wall time."""
+    barrier = context.Barrier(concurrency + 1)
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_session_worker,
+            args=(stub_url, first_number + offset, requests_per_session, unique, barrier, results),
+            daemon=True
+        )
+        for offset in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        barrier.wait(STARTUP_TIMEOUT)
+    except Exception:
+        pass
+    # The clock starts once every session has loaded its page
+    started = time.perf_counter()
+    latencies, outcomes, page_loads, peak_rss = [], [], [], []
+    for _ in workers:
+        worker_latencies, worker_outcomes, page_load, rss = results.get()
+        latencies.extend(worker_latencies)
+        outcomes.extend(worker_outcomes)
+        peak_rss.append(rss)
+        if page_load is not None:
+            page_loads.append(page_load)
+    wall = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+    return latencies, outcomes, page_loads, peak_rss, wall
+
+
+def _memory_worker(stub_url, sessions, requests_per_session, unique, results):
+    results.put(session_memory(stub_url, sessions, requests_per_session, unique))
+
+
+def session_memory(stub_url, sessions, requests_per_session, unique=True):
+    """Traced bytes (retained, peak) per session after its requests; a separate, untimed pass."""
+    # A warm-up session pays the one-off imports and resource caches first
+    _quiet_streamlit()
+    warm_up = Session(stub_url, -1, unique)
+    _quiet_streamlit()
+    warm_up.submit()
+    del warm_up
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    live = []
+    for number in range(sessions):
+        session = Session(stub_url, -2 - number, unique)
+        for _ in range(requests_per_session):
+            session.submit()
+        live.append(session)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - baseline) / sessions, (peak - baseline) / sessions
+
+
+def _result(latencies, outcomes, page_loads, peak_rss, wall):
+    latencies = sorted(latencies)
+    completed = sum(1 for outcome in outcomes if outcome in ("ok", "degraded"))
+    mean = statistics.fmean(latencies) if latencies else 0.0
+    return {
+        "iterations": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "mean_ms": mean * 1000,
+        "throughput_per_sec": completed / wall if wall else 0.0,
+        "throughput_unit": "assessments",
+        "worker_rss_kb": statistics.median(peak_rss) if peak_rss else 0.0,
+        "page_load_p50_ms": statistics.median(page_loads) * 1000 if page_loads else 0.0,
+        "ok": outcomes.count("ok"),
+        "degraded": outcomes.count("degraded"),
+        "errors": len(outcomes) - completed,
+    }
+
+
+def _memory_result(memory, sessions, requests_per_session):
+    retained, peak = memory
+    return {
+        "iterations": sessions,
+        "requests_per_session": requests_per_session,
+        "peak_memory_kb": peak / 1024,
+        "retained_memory_kb": retained / 1024,
+    }
+
+
+def _log(key, result):
+    print(
+        f"{key:22s} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+        f"p99 {result['p99_ms']:8.1f} ms  {result['throughput_per_sec']:6.2f} assessments/s  "
+        f"rss {result['worker_rss_kb'] / 1024:6.1f} MB  "
+        f"ok {result['ok']} degraded {result['degraded']} errors {result['errors']}",
+        file=sys.stderr
+    )
+
+
+def configure_app_environment(workdir, crewai_rate_limit=None):
+    """Point the app's caches at a scratch directory; workers inherit the environment."""
+    os.environ["RISK_ASSESSMENT_CACHE_DIR"] = os.path.join(workdir, "assessment_cache")
+    os.environ["RISK_HISTORY_DB"] = os.path.join(workdir, "history.db")
+    if crewai_rate_limit is not None:
+        os.environ["RISK_CREWAI_RATE_LIMIT"] = str(crewai_rate_limit)
+
+
+def load(args):
+    from risk_engine.stub_crewai import StubCrewAIServer
+
+    levels = QUICK_CONCURRENCY_LEVELS if args.quick and not args.concurrency else (
+        tuple(int(level) for level in args.concurrency.split(",")) if args.concurrency else CONCURRENCY_LEVELS
+    )
+    # Fresh interpreters: the parent holds the stub server's threads
+    context = multiprocessing.get_context("spawn")
+    stub = StubCrewAIServer(latency=args.latency, error_rate=args.error_rate, run_time=args.run_time).start()
+    unique = not args.repeat_inputs
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="risk-loadtest-") as workdir:
+        configure_app_environment(workdir, args.crewai_rate_limit)
+        print(f"Stub CrewAI on {stub.url} (latency {args.latency}s, error rate {args.error_rate:.0%})",
+              file=sys.stderr)
+        memory_results = context.Queue()
+        memory_worker = context.Process(
+            target=_memory_worker, args=(stub.url, args.memory_sessions, args.requests, unique, memory_results)
+        )
+        memory_worker.start()
+        results["load/session_memory"] = _memory_result(memory_results.get(), args.memory_sessions, args.requests)
+        memory_worker.join()
+        memory = results["load/session_memory"]
+        print(
+            f"{'load/session_memory':22s} peak {memory['peak_memory_kb']:8.1f} KB/session  "
+            f"retained {memory['retained_memory_kb']:8.1f} KB/session "
+            f"({args.memory_sessions} sessions x {args.requests} requests, sequential)",
+            file=sys.stderr
+        )
+
+        first_number = 0
+        for concurrency in levels:
+            # Numbers are unique across levels so unique inputs never hit the assessment cache
+            level = run_level(context, stub.url, concurrency, args.requests, first_number, unique)
+            first_number += concurrency
+            key = f"load/concurrency={concurrency}"
+            results[key] = _result(*level)
+            _log(key, results[key])
+    stub.shutdown()
+    print(f"Stub served {stub.kickoff_count} kickoffs (peak {stub.max_active} concurrent)", file=sys.stderr)
+    return results
+
+
+def add_arguments(parser):
+    parser.add_argument("--concurrency", help="Comma-separated session counts to ramp through (default 1,2,4,8,16)")
+    parser.add_argument("--requests", type=int, default=3, help="Assessments each session submits per level")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub kickoff latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub kickoffs answered with 503")
+    parser.add_argument("--run-time", type=float, default=1.0, help="Seconds until a stub kickoff reports SUCCESS")
+    parser.add_argument("--crewai-rate-limit", type=float, default=None,
+                        help="Override the app's outbound kickoff rate limit per second (0: unlimited)")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="Submit identical inputs, exercising the assessment cache")
+    parser.add_argument("--memory-sessions", type=int, default=4, help="Sessions in the memory measurement pass")
+    parser.add_argument("--quick", action="store_true", help="Concurrency 1 and 4 only")
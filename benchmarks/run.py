@@ -0,0 +1,295 @@
+"""Benchmark the scoring, rendering, export and batch paths and compare runs.
+
+    python -m benchmarks run -o benchmarks/baselines/main.json
+    python -m benchmarks run --quick -o /tmp/current.json
+    python -m benchmarks compare benchmarks/baselines/main.json /tmp/current.json --threshold 0.15
+    python -m benchmarks load --quick -o /tmp/load.json
+
+Every case reports latency percentiles (ms), throughput and the peak
+traced memory of one call (tracemalloc, measured in a separate pass so it
+does not skew the timings). Analysis throughput is in MB of description
+per second; batch cases run once and report end-to-end projects/sec.
+
+``RuleIndex.scan`` stops as soon as every rule on a field has fired, so
+``analyse`` and ``analyse_documents`` cases are keyed by the scan they did: ``scan=early_exit`` on
+the default corpus, where that usually happens within the first few KB,
+and ``scan=full`` on a corpus that never mentions one rule's keywords and
+so is read to the end. Only ``scan=full`` measures throughput over the
+whole text. On early exit the ``fired_rules`` keyword lists are partial:
+they hold the keywords seen before the scan stopped, not every keyword in
+the text.
+``compare`` exits non-zero when any case's p50 or peak memory grew by more
+than the threshold. ``load`` drives app.py with concurrent headless
+sessions; see benchmarks/loadtest.py.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from risk_engine.assessment import (
+    analyse_documents, analyse_risks, build_complete_assessment, generate_intelligent_assessment,
+    iter_intelligent_assessment
+)
+from risk_engine.batch import run_batch
+from risk_engine.rules import RuleIndex, default_index
+
+from .corpus import FULL_SCAN_KEYWORDS, SIZES, make_projects, make_rules, make_text
+
+RULE_COUNTS = (7, 100, 1000)
+BATCH_SIZES = (1, 100, 10000, 100000)
+QUICK_SIZES = ("1KB", "100KB")
+QUICK_RULE_COUNTS = (7, 100)
+QUICK_BATCH_SIZES = (1, 1000)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, min_time=0.2, max_iterations=1000, units=1.0, unit="calls"):
+    """Time ``func`` repeatedly and return latency/throughput/peak memory stats."""
+    func()  # warm-up
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < 5 or (time.perf_counter() < deadline and len(timings) < max_iterations):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return {
+        "iterations": len(timings),
+        "p50_ms": _percentile(timings, 0.50) * 1000,
+        "p95_ms": _percentile(timings, 0.95) * 1000,
+        "p99_ms": _percentile(timings, 0.99) * 1000,
+        "mean_ms": mean * 1000,
+        "throughput_per_sec": units / mean if mean else 0.0,
+        "throughput_unit": unit,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def _scan_kind(index, text):
+    """"early_exit" if scanning ``text`` stops before its end because every description rule fired."""
+    fired = index.scan("description", text)
+    field_rules = {position for position, rule in enumerate(index.rules) if rule["field"] == "description"}
+    return "early_exit" if field_rules <= set(fired) else "full"
+
+
+def bench_engine(sizes, rule_counts, log):
+    results = {}
+    context = make_text(256, keyword_ratio=0.1, seed=1)
+    indexes = {count: RuleIndex(make_rules(count)) for count in rule_counts}
+    early_exits = 0
+    for size_name in sizes:
+        description = make_text(SIZES[size_name])
+        full_scan_description = make_text(SIZES[size_name], keywords=FULL_SCAN_KEYWORDS)
+        for count, index in indexes.items():
+            for text in (description, full_scan_description):
+                scan = _scan_kind(index, text)
+                # Synthetic rules never fire, so with more than 7 rules both corpora scan fully
+                key = f"analyse/desc={size_name}/rules={count}/scan={scan}"
+                if key in results:
+                    continue
+                early_exits += scan == "early_exit"
+                results[key] = measure(
+                    lambda: analyse_risks(text, context, index), units=len(text) / (1024 * 1024), unit="MB"
+                )
+                results[key]["scan"] = scan
+                log(key, results[key])
+
+        # Chunked scan + digest; peak memory should stay flat as the input grows
+        for text in (description, full_scan_description):
+            scan = _scan_kind(default_index(), text)
+            key = f"analyse_documents/desc={size_name}/scan={scan}"
+            if key in results:
+                continue
+            early_exits += scan == "early_exit"
+            results[key] = measure(lambda: analyse_documents(text, context), units=len(text) / (1024 * 1024), unit="MB")
+            results[key]["scan"] = scan
+            log(key, results[key])
+
+        analysis = analyse_risks(description, context)
+        key = f"render/desc={size_name}"
+        results[key] = measure(lambda: generate_intelligent_assessment(
+            "Benchmark Project", description, context, "High", "Medium", analysis
+        ))
+        log(key, results[key])
+
+        # What the app's st.write_stream waits for before showing anything
+        key = f"render_first_section/desc={size_name}"
+        results[key] = measure(lambda: next(iter_intelligent_assessment(
+            "Benchmark Project", description, context, "High", "Medium", analysis
+        )))
+        log(key, results[key])
+
+        report = generate_intelligent_assessment("Benchmark Project", description, context, "High", "Medium", analysis)
+        complete_assessment = build_complete_assessment(
+            "Benchmark Project", description, context, "High", "Medium", report, "benchmark", analysis=analysis
+        )
+        key = f"export_json/desc={size_name}"
+        results[key] = measure(lambda: json.dumps(complete_assessment, indent=2))
+        log(key, results[key])
+    if early_exits:
+        print(
+            f"{early_exits} analyse case(s) stopped scanning early: their MB/s covers the whole input but not "
+            f"all of it was read, and their fired_rules keyword lists are partial",
+            file=sys.stderr
+        )
+    return results
+
+
+def _run_batch_once(count, workers, traced=False):
+    out = open(os.devnull, "w")
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    stats = run_batch(make_projects(count), out, workers=workers, chunk_size=64)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if traced else None
+    if traced:
+        tracemalloc.stop()
+    out.close()
+    return stats, elapsed, peak
+
+
+def bench_batch(batch_sizes, workers, log, max_traced=10000):
+    results = {}
+    for count in batch_sizes:
+        stats, elapsed, _ = _run_batch_once(count, workers)
+        # tracemalloc slows the parent's pickling a lot, so peak memory (the
+        # parent's streaming side; workers are other processes) comes from a
+        # separate, capped pass
+        _, _, peak = _run_batch_once(min(count, max_traced), workers, traced=True)
+        key = f"batch/projects={count}"
+        results[key] = {
+            "iterations": 1,
+            "p50_ms": elapsed * 1000,
+            "p95_ms": elapsed * 1000,
+            "p99_ms": elapsed * 1000,
+            "mean_ms": elapsed * 1000,
+            "throughput_per_sec": stats["assessed"] / elapsed if elapsed else 0.0,
+            "throughput_unit": "projects",
+            "peak_memory_kb": peak / 1024,
+        }
+        log(key, results[key])
+    return results
+
+
+def _log(key, result):
+    print(
+        f"{key:46s} p50 {result['p50_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms  "
+        f"{result['throughput_per_sec']:12.1f} {result['throughput_unit']}/s  "
+        f"peak {result['peak_memory_kb']:10.1f} KB",
+        file=sys.stderr
+    )
+
+
+def run(args):
+    sizes = QUICK_SIZES if args.quick else tuple(SIZES)
+    rule_counts = QUICK_RULE_COUNTS if args.quick else RULE_COUNTS
+    batch_sizes = QUICK_BATCH_SIZES if args.quick else BATCH_SIZES
+    results = bench_engine(sizes, rule_counts, _log)
+    if not args.skip_batch:
+        results.update(bench_batch(batch_sizes, args.workers, _log))
+    return _save(results, args)
+
+
+def load(args):
+    from .loadtest import load as load_test
+
+    return _save(load_test(args), args)
+
+
+def _save(results, args):
+    baseline = {
+        "meta": {
+            "created": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        json.dump(baseline, sys.stdout, indent=2)
+    return 0
+
+
+def compare_results(baseline, current, threshold):
+    """Return (rows, regressions) comparing p50 latency and peak memory per case."""
+    rows, regressions = [], []
+    for key, new in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        for metric in ("p50_ms", "peak_memory_kb"):
+            if not old.get(metric) or not new.get(metric):
+                continue
+            change = new[metric] / old[metric] - 1
+            row = (key, metric, old[metric], new[metric], change)
+            rows.append(row)
+            if change > threshold:
+                regressions.append(row)
+    return rows, regressions
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows, regressions = compare_results(baseline, current, args.threshold)
+    for key, metric, old, new, change in rows:
+        flag = "REGRESSION" if change > args.threshold else ""
+        print(f"{key:42s} {metric:15s} {old:12.3f} -> {new:12.3f} ({change:+7.1%}) {flag}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} across {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Assessment engine benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save a baseline")
+    run_parser.add_argument("-o", "--output", help="Baseline JSON to write (default: stdout)")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller corpora and batches")
+    run_parser.add_argument("--skip-batch", action="store_true", help="Skip the process-pool batch cases")
+    run_parser.add_argument("-w", "--workers", type=int, default=None, help="Batch worker processes")
+    run_parser.set_defaults(handler=run)
+
+    load_parser = commands.add_parser("load", help="Load-test app.py with concurrent simulated sessions")
+    load_parser.add_argument("-o", "--output", help="Results JSON to write (default: stdout)")
+    from .loadtest import add_arguments as add_load_arguments
+
+    add_load_arguments(load_parser)
+    load_parser.set_defaults(handler=load)
+
+    compare_parser = commands.add_parser("compare", help="Compare two baselines")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.20,
+                                help="Allowed relative growth before flagging (default 0.20)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
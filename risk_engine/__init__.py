@@ -0,0 +1,37 @@
+"""Streamlit-free AI/ML risk assessment engine used by app.py and the batch runner.
+
+Importing the package only loads the rule table and the report templates; the
+rule index is compiled on first use and ``requests`` is only imported once
+the CrewAI client (``risk_engine.crewai_client``) actually sends a request.
+"""
+
+from .assessment import (
+    analyse_documents,
+    analyse_risks,
+    build_claude_prompt,
+    build_complete_assessment,
+    build_kickoff_payload,
+    generate_fallback_assessment,
+    generate_intelligent_assessment,
+    iter_fallback_assessment,
+    iter_intelligent_assessment,
+    score_risk,
+)
+from .rules import RISK_RULES, RULESET_VERSION, RuleIndex, default_index
+
+__all__ = [
+    "RISK_RULES",
+    "RULESET_VERSION",
+    "RuleIndex",
+    "analyse_documents",
+    "analyse_risks",
+    "build_claude_prompt",
+    "build_complete_assessment",
+    "build_kickoff_payload",
+    "default_index",
+    "generate_fallback_assessment",
+    "generate_intelligent_assessment",
+    "iter_fallback_assessment",
+    "iter_intelligent_assessment",
+    "score_risk",
+]
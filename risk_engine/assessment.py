@@ -0,0 +1,208 @@
+import time
+
+from .documents import CHUNK_SIZE, EXCERPT_CHARS, DocumentSummary, read_document, report_text
+from .report import iter_report
+from .rules import RULESET_VERSION, default_index
+
+
+def _analysis(matches):
+    analysis = {
+        "risk_categories": [],
+        "technical_risks": [],
+        "compliance_risks": [],
+        "operational_risks": [],
+        "mitigations": [],
+        "regulatory_notes": [],
+        "fired_rules": [],
+    }
+    for rule, keywords in matches:
+        if rule.get("category"):
+            analysis["risk_categories"].append(rule["category"])
+        for bucket, risks in rule.get("risks", {}).items():
+            analysis[f"{bucket}_risks"].extend(risks)
+        if rule.get("mitigation"):
+            analysis["mitigations"].append(rule["mitigation"])
+        if rule.get("regulatory_note"):
+            analysis["regulatory_notes"].append(rule["regulatory_note"])
+        analysis["fired_rules"].append({"rule": rule["id"], "field": rule["field"], "keywords": keywords})
+    return analysis
+
+
+def analyse_risks(description, context, index=None):
+    """Categorise a project by running the compiled keyword rules over its text."""
+    index = index or default_index()
+    return _analysis(index.match({"description": description, "context": context}))
+
+
+def analyse_documents(description, context, index=None, chunk_size=CHUNK_SIZE, excerpt_chars=EXCERPT_CHARS):
+    """analyse_risks for documents of any size, read once in fixed-size chunks.
+
+    ``description``/``context`` may be strings, file objects (text or
+    binary, e.g. uploads) or iterables of those; see documents.iter_chunks.
+    Returns ``(analysis, {"description": DocumentSummary, "context": DocumentSummary})``;
+    pass the summaries to the report and build_complete_assessment in
+    place of the text.
+    """
+    index = index or default_index()
+    fired = {}
+    summaries = {
+        field: read_document(source, index.scanner(field, fired), chunk_size, excerpt_chars)
+        for field, source in (("description", description), ("context", context))
+    }
+    return _analysis(index.results(fired)), summaries
+
+
+def score_risk(impact, probability):
+    """Map impact/probability levels to (risk_score out of 7, overall risk level)."""
+    risk_score = 0
+    if impact == "Critical": risk_score += 4
+    elif impact == "High": risk_score += 3
+    elif impact == "Medium": risk_score += 2
+    else: risk_score += 1
+    
+    if probability == "High": risk_score += 3
+    elif probability == "Medium": risk_score += 2
+    else: risk_score += 1
+    
+    if risk_score >= 6: overall_risk = "CRITICAL"
+    elif risk_score >= 4: overall_risk = "HIGH"
+    elif risk_score >= 3: overall_risk = "MEDIUM"
+    else: overall_risk = "LOW"
+    return risk_score, overall_risk
+
+
+def intelligent_report_values(project, description, context, impact, probability, analysis=None):
+    """Template values for the "intelligent" report layout."""
+    # Risk categorization logic
+    if analysis is None:
+        analysis = analyse_risks(description, context)
+    
+    # Generate risk level
+    risk_score, overall_risk = score_risk(impact, probability)
+    
+    return {
+        "project": project,
+        "description": report_text(description),
+        "context": report_text(context),
+        "impact": impact,
+        "probability": probability,
+        "impact_lower": impact.lower(),
+        "probability_lower": probability.lower(),
+        "assessment_date": time.strftime('%B %d, %Y'),
+        "risk_score": risk_score,
+        "overall_risk": overall_risk,
+        "risk_categories": analysis["risk_categories"],
+        "critical_risks": analysis["technical_risks"][:2],
+        "compliance_risks": analysis["compliance_risks"],
+        "operational_risks": analysis["operational_risks"],
+        "mitigations": analysis["mitigations"],
+        "regulatory_notes": analysis["regulatory_notes"],
+    }
+
+
+def iter_intelligent_assessment(project, description, context, impact, probability, analysis=None):
+    """Yield the intelligent assessment report one markdown section at a time."""
+    values = intelligent_report_values(project, description, context, impact, probability, analysis)
+    return iter_report("intelligent", values)
+
+
+# Intelligent assessment generation based on inputs
+def generate_intelligent_assessment(project, description, context, impact, probability, analysis=None):
+    return "".join(iter_intelligent_assessment(project, description, context, impact, probability, analysis))
+
+
+def fallback_report_values(project, description, context, impact, probability, workflow_id):
+    return {
+        "project": project,
+        "description": report_text(description),
+        "context": report_text(context),
+        "impact_lower": impact.lower(),
+        "probability_lower": probability.lower(),
+        "workflow_id": workflow_id,
+    }
+
+
+def iter_fallback_assessment(project, description, context, impact, probability, workflow_id):
+    values = fallback_report_values(project, description, context, impact, probability, workflow_id)
+    return iter_report("fallback", values)
+
+
+# Simple assessment used when the intelligent engine fails
+def generate_fallback_assessment(project, description, context, impact, probability, workflow_id):
+    return "".join(iter_fallback_assessment(project, description, context, impact, probability, workflow_id))
+
+
+# Prompt for a hosted LLM assessment (Claude), kept alongside the built-in engine
+def build_claude_prompt(project, description, context, impact, probability):
+    return f"""You are an expert AI/ML risk assessment analyst. Analyze the following system and provide a comprehensive risk assessment report.
+
+Project: {project}
+Description: {description}
+Context: {context}
+Initial Impact: {impact}
+Initial Probability: {probability}
+
+Please provide a detailed risk assessment report in markdown format that includes:
+
+1. **Executive Summary** - Key risks and overall assessment
+2. **Risk Classification** - Primary risk categories identified
+3. **Detailed Risk Analysis** - Specific risks with probability and impact
+4. **Compliance Considerations** - Regulatory and legal implications
+5. **Mitigation Strategies** - Specific actionable recommendations
+6. **Implementation Timeline** - Prioritized action items
+7. **Success Metrics** - How to measure risk mitigation effectiveness
+
+Make this a professional, comprehensive assessment that would be suitable for executive review. Focus on practical, actionable insights specific to this AI/ML system."""
+
+
+def build_kickoff_payload(project_name, risk_description, contextual_notes,
+                          initial_impact, initial_probability, customer_email="assessment@company.com"):
+    # Inputs for the CrewAI kickoff endpoint
+    return {
+        "inputs": {
+            "project_name": project_name,
+            "risk_description": risk_description,
+            "contextual_notes": contextual_notes,
+            "initial_probability": initial_probability,
+            "initial_impact": initial_impact,
+            "customer_email": customer_email
+        }
+    }
+
+
+def build_complete_assessment(project_name, risk_description, contextual_notes,
+                              initial_impact, initial_probability, assessment_content,
+                              workflow_id, crewai_status="workflow_initiated", analysis=None):
+    # Create comprehensive download data
+    complete_assessment = {
+        "workflow_info": {
+            "crewai_workflow_id": workflow_id,
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "assessment_type": "AI-Powered Risk Analysis"
+        },
+        "project_details": {
+            "project_name": project_name,
+            "risk_description": report_text(risk_description),
+            "contextual_notes": report_text(contextual_notes),
+            "initial_impact": initial_impact,
+            "initial_probability": initial_probability
+        },
+        "ai_assessment_report": assessment_content,
+        "metadata": {
+            "generated_by": "Claude AI + CrewAI Integration",
+            "model": "intelligent_assessment_engine",
+            "crewai_status": crewai_status
+        }
+    }
+    # Digests of documents that only made it into the assessment as excerpts
+    source_documents = {
+        field: value.as_dict()
+        for field, value in (("risk_description", risk_description), ("contextual_notes", contextual_notes))
+        if isinstance(value, DocumentSummary) and value.truncated
+    }
+    if source_documents:
+        complete_assessment["metadata"]["source_documents"] = source_documents
+    if analysis is not None:
+        complete_assessment["metadata"]["ruleset_version"] = RULESET_VERSION
+        complete_assessment["metadata"]["fired_rules"] = analysis["fired_rules"]
+    return complete_assessment
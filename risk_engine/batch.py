@@ -0,0 +1,277 @@
+"""Headless batch assessment over a CSV/JSONL portfolio.
+
+    python -m risk_engine.batch portfolio.csv -o assessments.jsonl --workers 8 --chunk-size 64
+
+Each output line is one ``complete_assessment`` document, written as soon as
+its chunk finishes. Only a bounded number of chunks is in flight at once, so
+memory stays flat regardless of how many projects are in the input.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+
+from .assessment import analyse_risks, build_complete_assessment, generate_intelligent_assessment
+from .cache import assessment_key
+
+REQUIRED_FIELDS = ("project_name", "risk_description")
+IMPACT_LEVELS = ("Low", "Medium", "High", "Critical")
+PROBABILITY_LEVELS = ("Low", "Medium", "High")
+
+
+def read_projects(path):
+    """Yield (line_number, project dict) from a .csv or .jsonl/.ndjson file.
+
+    A JSONL line that does not parse is yielded as (line_number, ValueError)
+    and reported like any other invalid row.
+    """
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, ValueError(f"invalid JSON: {e}")
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            # Header is line 1, so data rows start at 2
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+
+
+def _text_field(raw, field, default=""):
+    value = raw.get(field)
+    if value is None or value == "":
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string, got {type(value).__name__}")
+    return value
+
+
+def normalise_project(raw):
+    """Apply the same validation as the Streamlit form; return inputs or raise ValueError."""
+    if isinstance(raw, Exception):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError("expected a JSON object")
+    project = {
+        "project_name": _text_field(raw, "project_name").strip(),
+        "risk_description": _text_field(raw, "risk_description"),
+        "contextual_notes": _text_field(raw, "contextual_notes"),
+        "initial_impact": (_text_field(raw, "initial_impact") or "Medium").strip().capitalize(),
+        "initial_probability": (_text_field(raw, "initial_probability") or "Medium").strip().capitalize(),
+    }
+    missing = [field for field in REQUIRED_FIELDS if not project[field]]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if project["initial_impact"] not in IMPACT_LEVELS:
+        raise ValueError(f"invalid initial_impact {project['initial_impact']!r}")
+    if project["initial_probability"] not in PROBABILITY_LEVELS:
+        raise ValueError(f"invalid initial_probability {project['initial_probability']!r}")
+    return project
+
+
+def assess_project(project, workflow_id="batch_mode"):
+    """Run the assessment engine for one normalised project."""
+    analysis = analyse_risks(project["risk_description"], project["contextual_notes"])
+    report = generate_intelligent_assessment(
+        project["project_name"], project["risk_description"], project["contextual_notes"],
+        project["initial_impact"], project["initial_probability"], analysis
+    )
+    return build_complete_assessment(
+        project["project_name"], project["risk_description"], project["contextual_notes"],
+        project["initial_impact"], project["initial_probability"], report,
+        workflow_id, crewai_status="not_requested", analysis=analysis
+    )
+
+
+def _assess_chunk(chunk, workflow_id="batch_mode", history=False):
+    # Runs in a worker process; serialise there so the parent only writes bytes.
+    # With ``history`` the history records are flattened here as well.
+    lines, errors, records = [], [], []
+    if history:
+        from .history import history_record
+    for line_no, raw in chunk:
+        try:
+            project = normalise_project(raw)
+            complete_assessment = assess_project(project, workflow_id)
+            line = json.dumps(complete_assessment)
+            lines.append(line)
+            if history:
+                # Hash the inputs, not project_details, which keeps excerpts of long texts
+                records.append(history_record(complete_assessment, _project_hash(project), document=line))
+        except Exception as e:
+            errors.append((line_no, str(e)))
+    if history:
+        return lines, errors, records
+    return lines, errors
+
+
+def _project_hash(project):
+    return assessment_key(
+        project["project_name"], project["risk_description"], project["contextual_notes"],
+        project["initial_impact"], project["initial_probability"]
+    )
+
+
+def _input_hash(raw):
+    try:
+        return _project_hash(normalise_project(raw))
+    except Exception:
+        # Runs in the parent: never let one row abort the run. Unhashed rows
+        # are always assessed, and the worker reports them like any bad row.
+        return None
+
+
+def _unchanged(chunk, history):
+    """Split ``chunk`` into (rows to assess, number skipped because history already has them)."""
+    hashes = [_input_hash(raw) for _, raw in chunk]
+    known = history.known_hashes(h for h in hashes if h is not None)
+    if not known:
+        return chunk, 0
+    todo = [item for item, input_hash in zip(chunk, hashes) if input_hash not in known]
+    return todo, len(chunk) - len(todo)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(projects, out, workers=None, chunk_size=32, max_pending=None, progress=None, history=None):
+    """Assess ``projects`` on a process pool, streaming JSON lines to ``out``.
+
+    ``projects`` is an iterable of (line_number, dict) pairs, as produced by
+    read_projects. ``progress`` is called with the running stats dict after
+    every completed chunk. With a ``history`` store, projects whose inputs
+    and rule-set version are already stored are skipped (not written to
+    ``out``) and new assessments are added to it. Returns the final stats dict.
+    """
+    # multiprocessing is only loaded when a batch actually runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    stats = {"assessed": 0, "failed": 0, "skipped": 0, "elapsed": 0.0, "projects_per_sec": 0.0}
+    errors = []
+    started = time.perf_counter()
+
+    def collect(done):
+        for future in done:
+            lines, chunk_errors, *records = future.result()
+            if records:
+                history.add_many(records[0])
+            for line in lines:
+                out.write(line)
+                out.write("\n")
+            stats["assessed"] += len(lines)
+            stats["failed"] += len(chunk_errors)
+            errors.extend(chunk_errors)
+        stats["elapsed"] = time.perf_counter() - started
+        if stats["elapsed"] > 0:
+            stats["projects_per_sec"] = stats["assessed"] / stats["elapsed"]
+        if progress:
+            progress(stats)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in _chunks(projects, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            if history is not None:
+                chunk, skipped = _unchanged(chunk, history)
+                stats["skipped"] += skipped
+                if not chunk:
+                    continue
+            pending.add(pool.submit(_assess_chunk, chunk, "batch_mode", history is not None))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+
+    stats["errors"] = errors
+    return stats
+
+
+def _progress_printer(interval=0.5):
+    last = [0.0]
+
+    def report(stats):
+        now = time.perf_counter()
+        if now - last[0] < interval:
+            return
+        last[0] = now
+        _print_progress(stats)
+
+    return report
+
+
+def _print_progress(stats):
+    print(
+        f"\r{stats['assessed']} assessed, {stats['skipped']} unchanged, {stats['failed']} failed "
+        f"({stats['projects_per_sec']:.1f} projects/sec)",
+        end="", file=sys.stderr, flush=True
+    )
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch AI/ML risk assessment")
+    parser.add_argument("input", help="Projects as .csv or .jsonl")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=_positive_int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-c", "--chunk-size", type=_positive_int, default=32, help="Projects per worker task")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Disable progress reporting")
+    parser.add_argument("--history", help="SQLite history: store results and skip unchanged projects")
+    args = parser.parse_args(argv)
+
+    history = None
+    if args.history:
+        from .history import HistoryStore
+        history = HistoryStore(args.history)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_batch(
+            read_projects(args.input), out,
+            workers=args.workers, chunk_size=args.chunk_size,
+            progress=None if args.quiet else _progress_printer(), history=history
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if history is not None:
+            history.close()
+
+    if not args.quiet:
+        _print_progress(stats)
+        print(file=sys.stderr)
+    for line_no, message in stats["errors"]:
+        print(f"line {line_no}: {message}", file=sys.stderr)
+    print(
+        f"Assessed {stats['assessed']} projects ({stats['skipped']} unchanged, {stats['failed']} failed) in "
+        f"{stats['elapsed']:.2f}s - {stats['projects_per_sec']:.1f} projects/sec",
+        file=sys.stderr
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Content-addressed cache for complete assessments.
+
+Entries are keyed by a hash of the normalised form inputs plus the rule-set
+version, and live in a bounded in-process LRU backed by an optional on-disk
+tier (one compact JSON file per key) that survives restarts. Each entry keeps
+the ``complete_assessment`` dict and renders the indented download JSON only
+when first asked for it, then keeps that text so later hits never
+re-serialise.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .rules import RULESET_VERSION
+
+
+def _normalise(value):
+    return " ".join(str(value or "").split())
+
+
+def assessment_key(project_name, risk_description, contextual_notes, initial_impact,
+                   initial_probability, ruleset_version=RULESET_VERSION):
+    """Hex digest identifying one assessment's inputs; whitespace-only edits hash the same."""
+    fields = [project_name, risk_description, contextual_notes, initial_impact, initial_probability]
+    canonical = json.dumps([ruleset_version] + [_normalise(value) for value in fields])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("complete_assessment", "text", "_json")
+
+    def __init__(self, complete_assessment, text=None):
+        self.complete_assessment = complete_assessment
+        # Compact JSON as stored on disk, when already known
+        self.text = text
+        self._json = None
+
+    @property
+    def json(self):
+        """``json.dumps(indent=2)`` of the assessment, rendered on first use.
+
+        Indented output can't use the C encoder, so it's only paid for when a
+        download is actually requested.
+        """
+        if self._json is None:
+            self._json = json.dumps(self.complete_assessment, indent=2)
+        return self._json
+
+
+class AssessmentCache:
+    def __init__(self, max_entries=256, ttl=24 * 3600, directory=None, max_disk_entries=10000,
+                 prune_every=64, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.prune_every = prune_every
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._puts = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and self._clock() - stored_at > self.ttl
+
+    def get(self, key):
+        """Return the cached CacheEntry or None."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                stored_at, entry = item
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry
+                del self._entries[key]
+                self.stats["expired"] += 1
+
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, entry, self._clock())
+            return entry
+
+    def put(self, key, complete_assessment):
+        """Store ``complete_assessment`` under ``key`` and return the new CacheEntry."""
+        entry = CacheEntry(complete_assessment)
+        with self._lock:
+            self._remember(key, entry, self._clock())
+            self._puts += 1
+            prune = self.prune_every and self._puts % self.prune_every == 0
+        if self.directory:
+            entry.text = json.dumps(complete_assessment)
+            self._store(key, entry.text)
+            if prune:
+                self.prune()
+        return entry
+
+    def _remember(self, key, entry, stored_at):
+        self._entries[key] = (stored_at, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            if self._expired(os.path.getmtime(path)):
+                os.remove(path)
+                with self._lock:
+                    self.stats["expired"] += 1
+                return None
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            return CacheEntry(json.loads(text), text)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """Drop expired disk entries and the oldest ones beyond max_disk_entries."""
+        if not self.directory:
+            return 0
+        files = []
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for item in os.scandir(shard.path):
+                    if item.name.endswith(".json"):
+                        files.append((item.stat().st_mtime, item.path))
+        files.sort()
+        removed = 0
+        excess = len(files) - self.max_disk_entries if self.max_disk_entries else 0
+        for position, (mtime, path) in enumerate(files):
+            if position < excess or self._expired(mtime):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self.stats["evictions"] += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory:
+            for shard in os.scandir(self.directory):
+                if shard.is_dir():
+                    for item in os.scandir(shard.path):
+                        os.remove(item.path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,377 @@
+"""Background CrewAI kickoff client.
+
+Kickoffs run on a small thread pool over one pooled ``requests.Session``
+(keep-alive, retry with backoff), so the caller gets a KickoffHandle back
+immediately and can render the local assessment while CrewAI responds.
+A returned ``kickoff_id`` is polled for status in the background, and a
+circuit breaker skips CrewAI entirely for a cool-down window after
+repeated failures instead of paying the timeout on every request.
+
+One client is shared by every Streamlit session, so it also coordinates
+them: identical kickoffs that are still in flight (same payload hash)
+share a single call and handle, and outbound kickoffs pass a token-bucket
+rate limit and a concurrency cap. ``stats()`` reports the queue depth and
+time spent waiting.
+"""
+
+import json
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import metrics
+
+# Kickoff outcome states
+STARTED = "started"
+DIRECT_RESPONSE = "direct_response"
+HTTP_ERROR = "http_error"
+UNAVAILABLE = "unavailable"
+CIRCUIT_OPEN = "circuit_open"
+CACHED = "cached"
+
+TERMINAL_STATUSES = {"SUCCESS", "COMPLETED", "FAILED", "FAILURE", "ERROR", "CANCELLED"}
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open every call is refused; after ``reset_timeout`` seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class TokenBucket:
+    """``rate`` tokens per second, at most ``burst`` saved up.
+
+    Callers reserve their token under the lock (the balance may go
+    negative) and sleep off the deficit outside it, so waiters are served
+    in arrival order without holding the lock while sleeping.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def acquire(self):
+        """Take one token, blocking until it is available; returns seconds waited."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+def payload_key(payload):
+    """Hash identifying identical kickoff payloads."""
+    import hashlib
+
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class KickoffHandle:
+    """Result of a background kickoff plus any status polled since.
+
+    One handle may be shared by several callers whose identical kickoffs
+    were collapsed into one call; ``waiters`` counts them.
+    """
+
+    def __init__(self):
+        self.kickoff = Future()
+        self._lock = threading.Lock()
+        self._status = None
+        self._finished = False
+        self._callbacks = []
+        self.callback_errors = []
+        self.status_done = threading.Event()
+        self.waiters = 1
+
+    @classmethod
+    def completed(cls, outcome):
+        """A handle that is already resolved, e.g. for an assessment served from cache."""
+        handle = cls()
+        handle.kickoff.set_result(outcome)
+        handle._finish()
+        return handle
+
+    def wait_kickoff(self, timeout=None):
+        """Block until the kickoff outcome dict is known and return it."""
+        return self.kickoff.result(timeout)
+
+    def when_status_done(self, callback):
+        """Call ``callback(handle)`` once the status is final: on the polling thread, or now if it already is."""
+        with self._lock:
+            if not self._finished:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set_status(self, status):
+        with self._lock:
+            self._status = status
+
+    def _finish(self):
+        # Callbacks run before status_done is set, so a waiter sees what they stored.
+        # A shared handle carries several sessions' callbacks; one failing must not
+        # skip the rest, so each error is printed and kept in callback_errors.
+        with self._lock:
+            self._finished = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                traceback.print_exc()
+                self.callback_errors.append(e)
+        self.status_done.set()
+
+    def snapshot(self):
+        """Current CrewAI view for merging into complete_assessment."""
+        outcome = self.kickoff.result() if self.kickoff.done() else None
+        with self._lock:
+            status = self._status
+        return {
+            "crewai_workflow_id": outcome["workflow_id"] if outcome else "pending",
+            "kickoff_state": outcome["state"] if outcome else "pending",
+            "status_state": (status or {}).get("state"),
+            "crewai_result": (status or {}).get("result"),
+        }
+
+
+def merge_crewai_status(complete_assessment, handle):
+    """Fold the latest kickoff/status of ``handle`` into a complete_assessment dict."""
+    snapshot = handle.snapshot()
+    complete_assessment["workflow_info"]["crewai_workflow_id"] = snapshot["crewai_workflow_id"]
+    if snapshot["status_state"]:
+        complete_assessment["metadata"]["crewai_status"] = snapshot["status_state"]
+    if snapshot["crewai_result"] is not None:
+        complete_assessment["crewai_result"] = snapshot["crewai_result"]
+    return complete_assessment
+
+
+class CrewAIClient:
+    def __init__(self, api_url, api_token, timeout=30, retries=2, backoff_factor=0.5,
+                 poll_interval=5.0, poll_timeout=600.0, breaker=None, max_workers=8,
+                 rate_limit=None, burst=5, max_concurrent=None):
+        self.api_url = api_url
+        self.api_token = api_token
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crewai")
+        self._session = None
+        self._session_lock = threading.Lock()
+        # Kickoffs per second (None: unlimited) and simultaneous kickoff requests
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.max_concurrent = max_concurrent or max_workers
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {"submitted": 0, "deduplicated": 0, "queued": 0, "active": 0, "queue_wait_total": 0.0}
+
+    @property
+    def session(self):
+        # requests is only imported once the client is actually used
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # POST is retried on connect errors and 429/5xx only; read errors are
+        # not retried so a slow kickoff is never submitted twice.
+        retry = Retry(
+            total=self.retries, connect=self.retries, read=0, status=self.retries,
+            backoff_factor=self.backoff_factor, status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}), raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json"
+        })
+        return session
+
+    @property
+    def base_url(self):
+        url = self.api_url.rstrip("/")
+        return url[:-len("/kickoff")] if url.endswith("/kickoff") else url
+
+    def status_url(self, kickoff_id):
+        return f"{self.base_url}/status/{kickoff_id}"
+
+    def kickoff(self, payload):
+        """Start a kickoff in the background and return its KickoffHandle.
+
+        If an identical payload is already in flight, its handle is returned
+        instead and no new request is made.
+        """
+        key = payload_key(payload)
+        with self._lock:
+            handle = self._in_flight.get(key)
+            if handle is not None:
+                handle.waiters += 1
+                self._stats["deduplicated"] += 1
+                return handle
+        if not self.breaker.allow():
+            return KickoffHandle.completed({"workflow_id": "demo_mode", "state": CIRCUIT_OPEN, "status_code": None})
+        with self._lock:
+            # Another session may have registered the same payload meanwhile
+            handle = self._in_flight.get(key)
+            if handle is not None:
+                handle.waiters += 1
+                self._stats["deduplicated"] += 1
+                return handle
+            handle = self._in_flight[key] = KickoffHandle()
+            self._stats["submitted"] += 1
+            self._stats["queued"] += 1
+        self._executor.submit(self._run_kickoff, handle, payload, key, time.perf_counter())
+        return handle
+
+    def stats(self):
+        """Coordinator counters: queue depth, in-flight requests, dedup and wait totals."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = stats.pop("queued")
+        stats["in_flight"] = stats.pop("active")
+        stats["max_concurrent"] = self.max_concurrent
+        stats["rate_limit"] = self.limiter.rate if self.limiter else None
+        return stats
+
+    def _run_kickoff(self, handle, payload, key, queued_at):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self._slots.acquire()
+        queue_wait = time.perf_counter() - queued_at
+        with self._lock:
+            self._stats["queued"] -= 1
+            self._stats["active"] += 1
+            self._stats["queue_wait_total"] += queue_wait
+        metrics.observe("crewai_queue_wait", queue_wait)
+        started = time.perf_counter()
+        try:
+            outcome = self._post_kickoff(payload)
+        except Exception as e:
+            self.breaker.record_failure()
+            outcome = {"workflow_id": "demo_mode", "state": UNAVAILABLE, "status_code": None, "error": str(e)}
+        finally:
+            self._slots.release()
+            with self._lock:
+                self._stats["active"] -= 1
+                # Later identical kickoffs start a new call
+                self._in_flight.pop(key, None)
+        outcome["elapsed"] = time.perf_counter() - started
+        outcome["queue_wait"] = queue_wait
+        metrics.observe("crewai_request", outcome["elapsed"])
+        handle.kickoff.set_result(outcome)
+        if outcome["state"] == STARTED and self.poll_interval:
+            self._schedule_poll(handle, outcome["workflow_id"], time.monotonic() + self.poll_timeout)
+        else:
+            handle._finish()
+
+    def _post_kickoff(self, payload):
+        response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            if response.status_code >= 500 or response.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return {"workflow_id": "demo_mode", "state": HTTP_ERROR, "status_code": response.status_code}
+        self.breaker.record_success()
+        crewai_result = response.json()
+        if "kickoff_id" in crewai_result:
+            return {"workflow_id": crewai_result["kickoff_id"], "state": STARTED, "status_code": 200}
+        return {"workflow_id": DIRECT_RESPONSE, "state": DIRECT_RESPONSE, "status_code": 200,
+                "result": crewai_result}
+
+    def _schedule_poll(self, handle, kickoff_id, deadline):
+        timer = threading.Timer(self.poll_interval, self._poll_once, (handle, kickoff_id, deadline))
+        timer.daemon = True
+        timer.start()
+
+    def _poll_once(self, handle, kickoff_id, deadline):
+        final = False
+        try:
+            response = self.session.get(self.status_url(kickoff_id), timeout=self.timeout)
+            if response.status_code == 200:
+                status = response.json()
+                final = str(status.get("state", "")).upper() in TERMINAL_STATUSES
+                handle._set_status(status)
+        except Exception:
+            pass
+        if not final and time.monotonic() < deadline:
+            self._schedule_poll(handle, kickoff_id, deadline)
+        else:
+            handle._finish()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
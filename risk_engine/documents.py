@@ -0,0 +1,122 @@
+"""Reading large risk documents (pasted DPIAs, architecture docs, uploads) in chunks.
+
+A document is any of: a string, a text or binary file object (uploaded
+.txt/.md files included), or an iterable mixing those and plain
+str/bytes chunks. It is read once, in ``chunk_size`` pieces, while the
+rule scanner, a SHA-256 digest and a short excerpt are fed from each
+piece, so memory stays at a few chunks whatever the document's size.
+Reports embed the excerpt and digest rather than the whole text.
+"""
+
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+EXCERPT_CHARS = 2000
+
+
+class DocumentSummary:
+    """What a report keeps of a document: an excerpt, its size and its digest."""
+
+    __slots__ = ("excerpt", "sha256", "chars")
+
+    def __init__(self, excerpt, sha256, chars):
+        self.excerpt = excerpt
+        self.sha256 = sha256
+        self.chars = chars
+
+    @property
+    def truncated(self):
+        return self.chars > len(self.excerpt)
+
+    def report_text(self):
+        """The excerpt, marked with the full length and digest when truncated."""
+        if not self.truncated:
+            return self.excerpt
+        return (f"{self.excerpt.rstrip()}… *[excerpt: first {len(self.excerpt):,} of "
+                f"{self.chars:,} characters, SHA-256 {self.sha256}]*")
+
+    def __str__(self):
+        return self.report_text()
+
+    def as_dict(self):
+        return {"sha256": self.sha256, "chars": self.chars, "excerpt_chars": len(self.excerpt)}
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """Yield ``source`` as str pieces of at most ``chunk_size`` characters."""
+    if source is None:
+        return
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif isinstance(source, (bytes, bytearray)):
+        yield from _decode(
+            (source[start:start + chunk_size] for start in range(0, len(source), chunk_size))
+        )
+    elif hasattr(source, "read"):
+        blocks = iter(lambda: source.read(chunk_size), source.read(0))
+        first = next(blocks, None)
+        if first is None:
+            return
+        if isinstance(first, str):
+            yield first
+            yield from blocks
+        else:
+            yield from _decode(_prepend(first, blocks))
+    else:
+        for part in source:
+            yield from iter_chunks(part, chunk_size)
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def _decode(blocks):
+    # Incremental, so a multi-byte character split across reads survives
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for block in blocks:
+        text = decoder.decode(block)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def read_document(source, scanner=None, chunk_size=CHUNK_SIZE, excerpt_chars=EXCERPT_CHARS):
+    """Read ``source`` once, feeding ``scanner`` (a RuleIndex ChunkScanner) if given.
+
+    Returns a DocumentSummary.
+    """
+    # hashlib loads OpenSSL; keep it out of the package import
+    import hashlib
+
+    digest = hashlib.sha256()
+    excerpt = []
+    excerpt_left = excerpt_chars
+    chars = 0
+    for chunk in iter_chunks(source, chunk_size):
+        digest.update(chunk.encode("utf-8"))
+        chars += len(chunk)
+        if excerpt_left > 0:
+            excerpt.append(chunk[:excerpt_left])
+            excerpt_left -= len(excerpt[-1])
+        if scanner is not None:
+            scanner.feed(chunk)
+    if scanner is not None:
+        scanner.close()
+    return DocumentSummary("".join(excerpt), digest.hexdigest(), chars)
+
+
+def report_text(value, excerpt_chars=EXCERPT_CHARS):
+    """Text to embed in a report for a form field or a DocumentSummary.
+
+    Strings up to ``excerpt_chars`` long are returned unchanged.
+    """
+    if isinstance(value, DocumentSummary):
+        return value.report_text()
+    if value is None or len(value) <= excerpt_chars:
+        return value
+    return read_document(value, excerpt_chars=excerpt_chars).report_text()
@@ -0,0 +1,122 @@
+"""Streamed bulk export of many assessments as a ZIP or gzip'd NDJSON.
+
+    python -m risk_engine.export assessment_history.db -o critical.zip --risk CRITICAL
+    python -m risk_engine.export assessment_history.db -o q3.ndjson.gz --since 2026-07-01
+
+Both formats are written one assessment at a time. Only the current
+assessment's JSON/markdown and the compressor's window are held in memory,
+however many reports are exported. ZIP members are dated with their
+assessment's timestamp.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import zipfile
+import zlib
+
+from .history import _timestamp
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _member_name(complete_assessment, position):
+    name = _UNSAFE_NAME.sub("_", complete_assessment["project_details"].get("project_name") or "project")
+    return f"{position:06d}_{name.strip('_')[:80] or 'project'}"
+
+
+def write_zip(out, assessments, reports=True):
+    """Write one ``.json`` (and ``.md`` report) member per assessment to binary ``out``.
+
+    ``out`` need not be seekable. Returns the number of assessments written.
+    """
+    count = 0
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for position, complete_assessment in enumerate(assessments, 1):
+            _write_members(archive, complete_assessment, position, reports)
+            count = position
+    return count
+
+
+def _member_info(name, complete_assessment):
+    # archive.open(name, "w") would date every member 1980-01-01
+    try:
+        date_time = time.strptime(complete_assessment["workflow_info"]["timestamp"], "%Y-%m-%d %H:%M:%S")[:6]
+    except (KeyError, TypeError, ValueError):
+        date_time = time.localtime()[:6]
+    info = zipfile.ZipInfo(name, max(date_time, (1980, 1, 1, 0, 0, 0)))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _write_members(archive, complete_assessment, position, reports):
+    name = _member_name(complete_assessment, position)
+    with archive.open(_member_info(f"{name}.json", complete_assessment), "w") as member:
+        member.write(json.dumps(complete_assessment, indent=2).encode("utf-8"))
+    if reports and complete_assessment.get("ai_assessment_report"):
+        with archive.open(_member_info(f"{name}.md", complete_assessment), "w") as member:
+            member.write(complete_assessment["ai_assessment_report"].encode("utf-8"))
+
+
+def iter_ndjson_gz(assessments):
+    """Yield gzip-compressed NDJSON, one ``complete_assessment`` (dict or JSON text) per line."""
+    # wbits=31 writes a gzip header/trailer around the deflate stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for complete_assessment in assessments:
+        line = complete_assessment if isinstance(complete_assessment, str) else json.dumps(complete_assessment)
+        data = compressor.compress(line.encode("utf-8") + b"\n")
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def write_ndjson_gz(out, assessments):
+    """Write gzip'd NDJSON to binary ``out``. Returns the number of assessments written."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for complete_assessment in assessments:
+            count += 1
+            yield complete_assessment
+
+    for data in iter_ndjson_gz(counted()):
+        out.write(data)
+    return count
+
+
+def main(argv=None):
+    from .history import HistoryStore
+
+    parser = argparse.ArgumentParser(description="Bulk export assessments from the history store")
+    parser.add_argument("database", help="SQLite history file")
+    parser.add_argument("-o", "--output", required=True, help="Output .zip or .ndjson.gz file")
+    parser.add_argument("--risk", help="Overall risk (LOW, MEDIUM, HIGH, CRITICAL)")
+    parser.add_argument("--category", help="Risk category name")
+    parser.add_argument("--rule", help="Fired rule id, e.g. gdpr_regulatory_note")
+    parser.add_argument("--project", help="Exact project name")
+    parser.add_argument("--since", type=_timestamp, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--until", type=_timestamp, help="YYYY-MM-DD (exclusive)")
+    parser.add_argument("--no-reports", action="store_true", help="ZIP: omit the markdown reports")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.database)
+    filters = {
+        "overall_risk": args.risk.upper() if args.risk else None, "category": args.category,
+        "rule": args.rule, "project_name": args.project, "since": args.since, "until": args.until,
+    }
+    with open(args.output, "wb") as out:
+        if args.output.endswith(".zip"):
+            count = write_zip(out, store.iter_documents(**filters), reports=not args.no_reports)
+        else:
+            count = write_ndjson_gz(out, store.iter_documents(raw=True, **filters))
+    store.close()
+    print(f"Exported {count} assessments to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
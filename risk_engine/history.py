@@ -0,0 +1,316 @@
+"""SQLite history of complete assessments.
+
+    python -m risk_engine.history assessment_history.db --risk CRITICAL --rule gdpr_regulatory_note --since 2026-07-01
+
+Every stored assessment carries its input hash (``cache.assessment_key``,
+which covers the rule-set version), so a portfolio re-run can ask which
+inputs are already known and only recompute the rest. The database runs in
+WAL mode so readers (the UI, ad-hoc queries) never block the batch writer,
+and rows are inserted in batches, one transaction per batch.
+
+Fired rules live in a side table denormalised with the overall risk and
+timestamp, so "all CRITICAL projects touching GDPR this quarter" is a single
+index range scan rather than a join over the whole history.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+from .assessment import score_risk
+from .cache import assessment_key
+from .rules import RISK_RULES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    ruleset_version TEXT,
+    project_name TEXT NOT NULL,
+    initial_impact TEXT,
+    initial_probability TEXT,
+    risk_score INTEGER NOT NULL,
+    overall_risk TEXT NOT NULL,
+    workflow_id TEXT,
+    created_at REAL NOT NULL,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_input_hash ON assessments (input_hash);
+CREATE INDEX IF NOT EXISTS idx_assessments_project ON assessments (project_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_risk ON assessments (overall_risk, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments (created_at);
+
+CREATE TABLE IF NOT EXISTS assessment_rules (
+    assessment_id INTEGER NOT NULL REFERENCES assessments (id),
+    rule TEXT NOT NULL,
+    category TEXT,
+    overall_risk TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rules_rule ON assessment_rules (rule, overall_risk, created_at);
+CREATE INDEX IF NOT EXISTS idx_rules_category ON assessment_rules (category, overall_risk, created_at);
+CREATE INDEX IF NOT EXISTS idx_rules_assessment ON assessment_rules (assessment_id);
+"""
+
+SUMMARY_COLUMNS = (
+    "id", "input_hash", "project_name", "initial_impact", "initial_probability",
+    "risk_score", "overall_risk", "workflow_id", "created_at"
+)
+
+_RULE_CATEGORIES = {rule["id"]: rule.get("category") for rule in RISK_RULES}
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_VARIABLES = 900
+
+
+def history_record(complete_assessment, input_hash=None, document=None, created_at=None):
+    """Flatten one assessment into a picklable record for HistoryStore.add_many.
+
+    Cheap enough to build in a batch worker, so the parent never re-parses
+    the JSON it writes out.
+    """
+    details = complete_assessment["project_details"]
+    metadata = complete_assessment.get("metadata", {})
+    if input_hash is None:
+        input_hash = assessment_key(
+            details["project_name"], details["risk_description"], details["contextual_notes"],
+            details["initial_impact"], details["initial_probability"]
+        )
+    risk_score, overall_risk = score_risk(details["initial_impact"], details["initial_probability"])
+    rules = sorted({item["rule"] for item in metadata.get("fired_rules", [])})
+    return (
+        input_hash, metadata.get("ruleset_version"), details["project_name"],
+        details["initial_impact"], details["initial_probability"], risk_score, overall_risk,
+        complete_assessment.get("workflow_info", {}).get("crewai_workflow_id"),
+        time.time() if created_at is None else created_at,
+        document if document is not None else json.dumps(complete_assessment),
+        rules,
+    )
+
+
+class HistoryStore:
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # One connection shared by the app's threads; access goes through the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, complete_assessment, input_hash=None, document=None):
+        """Store one assessment and return its id."""
+        return self.add_many([history_record(complete_assessment, input_hash, document)])[0]
+
+    def update_document(self, assessment_id, complete_assessment, document=None):
+        """Replace a stored assessment's document, e.g. once its CrewAI status has arrived."""
+        document = document or json.dumps(complete_assessment)
+        workflow_id = complete_assessment.get("workflow_info", {}).get("crewai_workflow_id")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE assessments SET document = ?, workflow_id = ? WHERE id = ?",
+                (document, workflow_id, assessment_id)
+            )
+
+    def add_many(self, records):
+        """Insert ``history_record`` tuples, ``batch_size`` per transaction; return their ids."""
+        records = list(records)
+        ids = []
+        for start in range(0, len(records), self.batch_size):
+            ids.extend(self._insert(records[start:start + self.batch_size]))
+        return ids
+
+    def _insert(self, records):
+        with self._lock:
+            conn = self._conn
+            # IMMEDIATE takes the write lock up front, so the ids below can't collide
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM assessments").fetchone()[0]
+                ids = list(range(first_id, first_id + len(records)))
+                conn.executemany(
+                    "INSERT INTO assessments (id, input_hash, ruleset_version, project_name, initial_impact, "
+                    "initial_probability, risk_score, overall_risk, workflow_id, created_at, document) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(row_id,) + record[:10] for row_id, record in zip(ids, records)]
+                )
+                conn.executemany(
+                    "INSERT INTO assessment_rules (assessment_id, rule, category, overall_risk, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (row_id, rule, _RULE_CATEGORIES.get(rule), record[6], record[8])
+                        for row_id, record in zip(ids, records) for rule in record[10]
+                    ]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def known_hashes(self, input_hashes):
+        """Subset of ``input_hashes`` that already have a stored assessment."""
+        input_hashes = list(input_hashes)
+        known = set()
+        with self._lock:
+            for start in range(0, len(input_hashes), _MAX_VARIABLES):
+                batch = input_hashes[start:start + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(batch))
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT input_hash FROM assessments WHERE input_hash IN ({placeholders})", batch
+                ))
+        return known
+
+    def _where(self, overall_risk, category, rule, project_name, since, until):
+        tag_clauses, tag_params = [], []
+        if rule is not None:
+            tag_clauses.append("r.rule = ?")
+            tag_params.append(rule)
+        if category is not None:
+            tag_clauses.append("r.category = ?")
+            tag_params.append(category)
+
+        if tag_clauses and project_name is None:
+            # Range scan on the denormalised rules index, then primary-key lookups
+            clauses, params, prefix = tag_clauses, tag_params, "r."
+            source = "assessment_rules r JOIN assessments a ON a.id = r.assessment_id"
+            # A rule is stored once per assessment, but a category can repeat
+            distinct = rule is None
+        else:
+            # A project's history is small: walk it and probe the rules per row
+            clauses, params, prefix = [], [], "a."
+            source = "assessments a"
+            distinct = False
+            if project_name is not None:
+                clauses.append("a.project_name = ?")
+                params.append(project_name)
+            if tag_clauses:
+                clauses.append(
+                    "EXISTS (SELECT 1 FROM assessment_rules r WHERE r.assessment_id = a.id AND "
+                    f"{' AND '.join(tag_clauses)})"
+                )
+                params.extend(tag_params)
+        # Unary + keeps SQLite on the project index when a project is named
+        column = f"+{prefix}" if project_name is not None else prefix
+        if overall_risk is not None:
+            clauses.append(f"{column}overall_risk = ?")
+            params.append(overall_risk)
+        if since is not None:
+            clauses.append(f"{column}created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{column}created_at < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return source, where, params, distinct, prefix
+
+    def query(self, overall_risk=None, category=None, rule=None, project_name=None,
+              since=None, until=None, limit=100):
+        """Newest-first assessment summaries matching every given filter.
+
+        ``since``/``until`` are Unix timestamps; ``rule`` is a rule id (e.g.
+        ``gdpr_regulatory_note``) and ``category`` a risk category name.
+        """
+        source, where, params, distinct, prefix = self._where(
+            overall_risk, category, rule, project_name, since, until
+        )
+        columns = ", ".join(f"a.{column}" for column in SUMMARY_COLUMNS)
+        sql = (f"SELECT {'DISTINCT ' if distinct else ''}{columns} FROM {source}{where} "
+               f"ORDER BY {prefix}created_at DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in rows]
+
+    def count(self, overall_risk=None, category=None, rule=None, project_name=None, since=None, until=None):
+        source, where, params, distinct, prefix = self._where(
+            overall_risk, category, rule, project_name, since, until
+        )
+        if prefix == "r.":
+            # Everything filtered on is in the rules index; skip the join
+            source = "assessment_rules r"
+        target = f"DISTINCT {prefix}{'assessment_id' if prefix == 'r.' else 'id'}" if distinct else "*"
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT({target}) FROM {source}{where}", params).fetchone()[0]
+
+    def iter_documents(self, overall_risk=None, category=None, rule=None, project_name=None,
+                       since=None, until=None, raw=False, fetch_size=256, limit=None):
+        """Stream matching ``complete_assessment`` documents, oldest first.
+
+        Uses its own read connection, so a long export neither holds the
+        store's lock nor blocks writers (WAL). ``raw`` yields the stored JSON
+        text instead of parsed dicts; ``limit`` stops after that many.
+        """
+        source, where, params, distinct, prefix = self._where(
+            overall_risk, category, rule, project_name, since, until
+        )
+        sql = (f"SELECT {'DISTINCT ' if distinct else ''}a.id, a.document FROM {source}{where} "
+               f"ORDER BY {prefix}created_at, a.id")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = [*params, limit]
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    return
+                for _, document in rows:
+                    yield document if raw else json.loads(document)
+        finally:
+            conn.close()
+
+    def document(self, assessment_id):
+        """The stored ``complete_assessment`` dict, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT document FROM assessments WHERE id = ?", (assessment_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM assessments").fetchone()[0]
+
+
+def _timestamp(value):
+    return time.mktime(time.strptime(value, "%Y-%m-%d"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the assessment history")
+    parser.add_argument("database", help="SQLite history file")
+    parser.add_argument("--risk", help="Overall risk (LOW, MEDIUM, HIGH, CRITICAL)")
+    parser.add_argument("--category", help="Risk category name")
+    parser.add_argument("--rule", help="Fired rule id, e.g. gdpr_regulatory_note")
+    parser.add_argument("--project", help="Exact project name")
+    parser.add_argument("--since", type=_timestamp, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--until", type=_timestamp, help="YYYY-MM-DD (exclusive)")
+    parser.add_argument("-n", "--limit", type=int, default=100)
+    parser.add_argument("--count", action="store_true", help="Print the number of matches only")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.database)
+    filters = {
+        "overall_risk": args.risk.upper() if args.risk else None, "category": args.category,
+        "rule": args.rule, "project_name": args.project, "since": args.since, "until": args.until,
+    }
+    started = time.perf_counter()
+    if args.count:
+        print(store.count(**filters))
+    else:
+        for row in store.query(limit=args.limit, **filters):
+            print(json.dumps(row))
+    print(f"Query took {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
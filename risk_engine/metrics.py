@@ -0,0 +1,254 @@
+"""Lightweight per-stage timing: spans, histograms and a Prometheus endpoint.
+
+Instrumentation is off unless ``RISK_METRICS`` is set (or ``enable()`` is
+called). While off, ``start_trace()`` and ``span()`` hand back shared no-op
+objects, so the instrumented code paths cost one attribute lookup and a
+no-op ``with`` block.
+
+When on, every finished span is observed into a per-stage histogram
+(``risk_assessment_stage_duration_seconds``), optionally appended to a
+JSON-lines log (``RISK_METRICS_LOG``), and kept on its Trace so a UI can
+show the breakdown for the current run. ``start_http_server`` serves the
+histograms in Prometheus text format on ``/metrics``.
+"""
+
+import json
+import os
+import threading
+import time
+
+METRIC_NAME = "risk_assessment_stage_duration_seconds"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._log = None
+
+    def open_log(self, path):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = open(path, "a", encoding="utf-8", buffering=1) if path else None
+
+    def observe(self, stage, seconds, run_id=None):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if self._log is not None:
+                self._log.write(json.dumps({
+                    "ts": time.time(), "stage": stage, "duration_ms": round(seconds * 1000, 3), "run_id": run_id
+                }) + "\n")
+
+    def render_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each assessment stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+REGISTRY = MetricsRegistry()
+_enabled = os.environ.get("RISK_METRICS", "").lower() not in ("", "0", "false", "no")
+if _enabled and os.environ.get("RISK_METRICS_LOG"):
+    REGISTRY.open_log(os.environ["RISK_METRICS_LOG"])
+
+
+def enabled():
+    return _enabled
+
+
+def enable(log_path=None):
+    global _enabled
+    _enabled = True
+    if log_path:
+        REGISTRY.open_log(log_path)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    REGISTRY.open_log(None)
+
+
+def observe(stage, seconds, run_id=None):
+    """Record a duration measured elsewhere (e.g. on a background thread)."""
+    if _enabled:
+        REGISTRY.observe(stage, seconds, run_id)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "started")
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class Trace:
+    """Spans of one run (one button click, one request)."""
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or os.urandom(6).hex()
+        self.spans = []
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+    def add(self, stage, seconds, observe=True):
+        """Record a span; ``observe=False`` if it already went into the histograms."""
+        self.spans.append((stage, seconds))
+        if observe:
+            REGISTRY.observe(stage, seconds, self.run_id)
+
+    def split_stream(self, producer_stage, consumer_stage, iterable, consumer):
+        """Run ``consumer(iterable)``, charging time spent producing items to
+        ``producer_stage`` and the rest (e.g. UI rendering) to ``consumer_stage``.
+        """
+        spent = [0.0]
+
+        def timed():
+            iterator = iter(iterable)
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    spent[0] += time.perf_counter() - started
+                    return
+                spent[0] += time.perf_counter() - started
+                yield item
+
+        started = time.perf_counter()
+        try:
+            return consumer(timed())
+        finally:
+            total = time.perf_counter() - started
+            self.add(producer_stage, spent[0])
+            self.add(consumer_stage, total - spent[0])
+
+    def breakdown(self):
+        """[(stage, total ms)] in first-seen order."""
+        totals = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds * 1000
+        return list(totals.items())
+
+
+class _NullTrace:
+    run_id = None
+    spans = ()
+
+    def span(self, stage):
+        return NULL_SPAN
+
+    def add(self, stage, seconds, observe=True):
+        pass
+
+    def split_stream(self, producer_stage, consumer_stage, iterable, consumer):
+        return consumer(iterable)
+
+    def breakdown(self):
+        return []
+
+
+NULL_TRACE = _NullTrace()
+
+
+def start_trace(run_id=None):
+    return Trace(run_id) if _enabled else NULL_TRACE
+
+
+class _RegistrySpan(_Span):
+    __slots__ = ()
+
+    def __exit__(self, *exc_info):
+        REGISTRY.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+def span(stage):
+    """Standalone span recorded straight into the histograms (no Trace)."""
+    return _RegistrySpan(None, stage) if _enabled else NULL_SPAN
+
+
+def start_http_server(port, host="127.0.0.1", registry=None):
+    """Serve ``/metrics`` in Prometheus text format on a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    return server
@@ -0,0 +1,188 @@
+"""Columnar portfolio representation with vectorised scoring and aggregation.
+
+A Portfolio keeps impact and probability as small integer code arrays and
+the identified risk categories as a boolean (projects x categories) mask
+matrix. Scores, LOW/MEDIUM/HIGH/CRITICAL bucketing, the impact x
+probability heat-map and the per-category counts are single NumPy
+operations over those arrays, so dashboards over tens of thousands of
+projects don't go through ``score_risk`` one project at a time.
+
+Requires numpy; it is only imported by this module.
+"""
+
+import json
+import re
+
+import numpy as np
+
+from .batch import IMPACT_LEVELS, PROBABILITY_LEVELS
+from .rules import RISK_RULES, default_index
+
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# Same thresholds as score_risk: >=6 CRITICAL, >=4 HIGH, >=3 MEDIUM, else LOW
+_SCORE_TO_LEVEL = np.array([0, 0, 0, 1, 2, 2, 3, 3], dtype=np.uint8)
+
+_IMPACT_CODES = {level: code for code, level in enumerate(IMPACT_LEVELS)}
+_PROBABILITY_CODES = {level: code for code, level in enumerate(PROBABILITY_LEVELS)}
+
+# A quote inside a JSON string is escaped, so a quoted key followed by a
+# colon only matches a key. In complete_assessment order, the first
+# "project_details" is the top-level one and the first "fired_rules" is
+# metadata's, which comes before any crewai_result.
+_COLON = re.compile(r"\s*:\s*")
+_DECODER = json.JSONDecoder()
+
+
+def category_names(rules=RISK_RULES):
+    """Risk categories in rule-table order (rules without a category are skipped)."""
+    names = []
+    for rule in rules:
+        if rule.get("category") and rule["category"] not in names:
+            names.append(rule["category"])
+    return names
+
+
+def _code(codes, value):
+    # Blank defaults to Medium like the form and batch input; unknown levels
+    # score like "Low", matching score_risk's else branches
+    return codes.get(str(value or "Medium").strip().capitalize(), 0)
+
+
+class Portfolio:
+    def __init__(self, names, impact, probability, categories, categories_names=None):
+        self.names = list(names)
+        self.impact = np.asarray(impact, dtype=np.uint8)
+        self.probability = np.asarray(probability, dtype=np.uint8)
+        self.categories = np.asarray(categories, dtype=bool)
+        self.category_names = list(categories_names or category_names())
+        if self.categories.shape != (len(self.impact), len(self.category_names)):
+            raise ValueError("categories must be a (projects x categories) matrix")
+
+    def __len__(self):
+        return len(self.impact)
+
+    @classmethod
+    def from_projects(cls, projects, index=None):
+        """Build from raw project dicts (form/batch field names), categorising their text."""
+        index = index or default_index()
+        names_list = category_names(index.rules)
+        column = {name: position for position, name in enumerate(names_list)}
+        names, impact, probability, rows = [], [], [], []
+        for project in projects:
+            names.append(project.get("project_name", ""))
+            impact.append(_code(_IMPACT_CODES, project.get("initial_impact")))
+            probability.append(_code(_PROBABILITY_CODES, project.get("initial_probability")))
+            fired = index.match({
+                "description": project.get("risk_description") or "",
+                "context": project.get("contextual_notes") or "",
+            })
+            rows.append([column[rule["category"]] for rule, _ in fired if rule.get("category")])
+        return cls(names, impact, probability, _mask(rows, len(names_list)), names_list)
+
+    @classmethod
+    def from_assessments(cls, assessments, rules=RISK_RULES):
+        """Build from complete_assessment dicts, reusing their recorded fired rules."""
+        names_list = category_names(rules)
+        column = {name: position for position, name in enumerate(names_list)}
+        rule_category = {rule["id"]: rule.get("category") for rule in rules}
+        names, impact, probability, rows = [], [], [], []
+        for assessment in assessments:
+            details = assessment["project_details"]
+            names.append(details.get("project_name", ""))
+            impact.append(_code(_IMPACT_CODES, details.get("initial_impact")))
+            probability.append(_code(_PROBABILITY_CODES, details.get("initial_probability")))
+            fired = assessment.get("metadata", {}).get("fired_rules", [])
+            rows.append([
+                column[rule_category[item["rule"]]] for item in fired if rule_category.get(item["rule"])
+            ])
+        return cls(names, impact, probability, _mask(rows, len(names_list)), names_list)
+
+    @classmethod
+    def from_assessments_jsonl(cls, text, rules=RISK_RULES):
+        """Build from complete_assessment JSON lines (batch/service output) without parsing their reports."""
+        return cls.from_assessments(_iter_assessment_fields(text), rules)
+
+    def risk_scores(self):
+        """Risk score out of 7 per project (impact points + probability points)."""
+        return self.impact + self.probability + 2
+
+    def risk_levels(self):
+        """Index into RISK_LEVELS per project."""
+        return _SCORE_TO_LEVEL[self.risk_scores()]
+
+    def heatmap(self):
+        """(impact x probability) project counts, rows/columns ordered as the *_LEVELS tuples."""
+        cells = self.impact.astype(np.intp) * len(PROBABILITY_LEVELS) + self.probability
+        counts = np.bincount(cells, minlength=len(IMPACT_LEVELS) * len(PROBABILITY_LEVELS))
+        return counts.reshape(len(IMPACT_LEVELS), len(PROBABILITY_LEVELS))
+
+    def level_counts(self):
+        counts = np.bincount(self.risk_levels(), minlength=len(RISK_LEVELS))
+        return dict(zip(RISK_LEVELS, counts.tolist()))
+
+    def category_counts(self):
+        return dict(zip(self.category_names, self.categories.sum(axis=0).tolist()))
+
+    def category_level_matrix(self):
+        """(categories x risk levels) counts: how many projects of each level touch each category."""
+        levels = np.zeros((len(self), len(RISK_LEVELS)), dtype=np.int64)
+        levels[np.arange(len(self)), self.risk_levels()] = 1
+        return self.categories.T.astype(np.int64) @ levels
+
+    def summary(self):
+        """All aggregates as plain Python values (JSON-serialisable)."""
+        return {
+            "projects": len(self),
+            "level_counts": self.level_counts(),
+            "category_counts": self.category_counts(),
+            "heatmap": {
+                impact: dict(zip(PROBABILITY_LEVELS, row))
+                for impact, row in zip(IMPACT_LEVELS, self.heatmap().tolist())
+            },
+            "category_levels": {
+                name: dict(zip(RISK_LEVELS, row))
+                for name, row in zip(self.category_names, self.category_level_matrix().tolist())
+            },
+        }
+
+
+def _value_at(text, key, start, end):
+    """Index of the value of the first ``key`` (quoted) in text[start:end], or None."""
+    while True:
+        found = text.find(key, start, end)
+        if found == -1:
+            return None
+        colon = _COLON.match(text, found + len(key), end)
+        if colon:
+            return colon.end()
+        start = found + len(key)
+
+
+def _iter_assessment_fields(text):
+    """Yield project_details and metadata.fired_rules of each JSON line in ``text``.
+
+    Only those two values are decoded, in place, so the report text is never
+    parsed or copied; a line where either isn't found is decoded whole.
+    """
+    start, end = 0, len(text)
+    while start < end:
+        newline = text.find("\n", start)
+        if newline == -1:
+            newline = end
+        details = _value_at(text, '"project_details"', start, newline)
+        fired = details is not None and _value_at(text, '"fired_rules"', details, newline)
+        if fired:
+            project_details, _ = _DECODER.raw_decode(text, details)
+            fired_rules, _ = _DECODER.raw_decode(text, fired)
+            yield {"project_details": project_details, "metadata": {"fired_rules": fired_rules}}
+        elif text[start:newline].strip():
+            yield json.loads(text[start:newline])
+        start = newline + 1
+
+
+def _mask(rows, width):
+    mask = np.zeros((len(rows), width), dtype=bool)
+    for position, columns in enumerate(rows):
+        mask[position, columns] = True
+    return mask
@@ -0,0 +1,251 @@
+"""Keyword rule table and the compiled index used to categorise risks.
+
+Each rule names the input field it scans (``description`` or ``context``),
+the keywords that fire it, the risks it contributes per bucket and an
+optional mitigation / regulatory note. The table is compiled once into a
+single trie-shaped regex per field, so a field is scanned in one pass with
+word-boundary matching no matter how many rules are added.
+"""
+
+import re
+from functools import lru_cache
+
+# Bump whenever RISK_RULES, or what an assessment stores for the same inputs,
+# changes so cached/stored assessments are recomputed
+RULESET_VERSION = "3"
+
+RISK_RULES = [
+    {
+        "id": "data_privacy",
+        "category": "Data Privacy & Security",
+        "field": "description",
+        "keywords": ["data", "personal", "customer", "customers", "crm", "sensitive"],
+        "risks": {"technical": ["Unauthorized access to sensitive customer data"]},
+        "mitigation": {
+            "strategy": "Implement Data Anonymization",
+            "timeline": "2-4 weeks",
+            "priority": "Critical"
+        },
+    },
+    {
+        "id": "regulatory_compliance",
+        "category": "Regulatory Compliance",
+        "field": "context",
+        "keywords": ["gdpr", "eu", "regulation", "regulations", "compliance"],
+        "risks": {"compliance": ["GDPR compliance violations and regulatory fines"]},
+        "mitigation": {
+            "strategy": "Establish GDPR Compliance Framework",
+            "timeline": "3-6 weeks",
+            "priority": "High"
+        },
+    },
+    {
+        "id": "ai_ml_ethics",
+        "category": "AI/ML Ethics & Bias",
+        "field": "description",
+        "keywords": ["ai", "ml", "model", "models", "algorithm", "algorithms",
+                     "automated", "automates", "automation"],
+        "risks": {"technical": ["Algorithmic bias in automated decision-making"]},
+        "mitigation": {
+            "strategy": "Deploy Bias Detection and Fairness Monitoring",
+            "timeline": "4-8 weeks",
+            "priority": "High"
+        },
+    },
+    {
+        "id": "communication_security",
+        "category": "Communication Security",
+        "field": "description",
+        "keywords": ["email", "emails", "communication", "communications", "message", "messages"],
+        "risks": {"operational": ["Inappropriate or harmful automated communications"]},
+    },
+    {
+        "id": "data_retention",
+        "category": "Data Retention",
+        "field": "context",
+        "keywords": ["storage", "retention", "days", "stored"],
+        "risks": {"compliance": ["Excessive data retention periods"]},
+    },
+    {
+        "id": "gdpr_regulatory_note",
+        "field": "context",
+        "keywords": ["eu", "gdpr"],
+        "regulatory_note": "**GDPR Compliance:** Critical for EU operations with personal data processing",
+    },
+    {
+        "id": "sensitive_data_note",
+        "field": "description",
+        "keywords": ["sensitive"],
+        "regulatory_note": "**Data Protection:** Enhanced security measures required for sensitive information",
+    },
+]
+
+
+def _trie_pattern(words):
+    # Build a prefix trie and render it as a regex, e.g. data|days -> da(?:ta|ys),
+    # so the engine never re-tries the same prefix once per keyword.
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        end = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 and not end else "(?:" + "|".join(branches) + ")"
+        return body + "?" if end else body
+
+    return render(trie)
+
+
+class RuleIndex:
+    """Rules compiled into one word-boundary regex per input field."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._keyword_rules = {}
+        self._patterns = {}
+        for position, rule in enumerate(self.rules):
+            for keyword in rule["keywords"]:
+                self._keyword_rules.setdefault((rule["field"], keyword.lower()), []).append(position)
+        for field in {rule["field"] for rule in self.rules}:
+            keywords = sorted({kw for (f, kw) in self._keyword_rules if f == field})
+            self._patterns[field] = re.compile(r"\b" + _trie_pattern(keywords) + r"\b", re.IGNORECASE)
+        self._field_rule_counts = {
+            field: sum(1 for rule in self.rules if rule["field"] == field) for field in self._patterns
+        }
+        self._max_keyword_lengths = {
+            field: max(len(kw) for (f, kw) in self._keyword_rules if f == field) for field in self._patterns
+        }
+        # Matched text -> keyword, for matches str.lower() doesn't map back (see _keyword)
+        self._folded = {}
+
+    def _remaining(self, field, fired):
+        return self._field_rule_counts[field] - sum(
+            1 for position in fired if self.rules[position]["field"] == field
+        )
+
+    def _keyword(self, field, text):
+        """The keyword that ``text``, a match of ``field``'s pattern, stands for."""
+        keyword = text.lower()
+        if (field, keyword) in self._keyword_rules:
+            return keyword
+        # re.IGNORECASE folds more than str.lower() undoes: "ſ" matches "s", "İ" matches "i".
+        # Resolve such matches with re's own folding, once per distinct spelling.
+        keyword = self._folded.get((field, text))
+        if keyword is None:
+            keyword = next(
+                kw for (f, kw) in self._keyword_rules
+                if f == field and len(kw) == len(text) and re.fullmatch(re.escape(kw), text, re.IGNORECASE)
+            )
+            self._folded[(field, text)] = keyword
+        return keyword
+
+    def _record(self, field, text, fired, remaining):
+        keyword = self._keyword(field, text)
+        for position in self._keyword_rules[(field, keyword)]:
+            if position not in fired:
+                fired[position] = set()
+                remaining -= 1
+            fired[position].add(keyword)
+        return remaining
+
+    def scan(self, field, text, fired=None):
+        """Scan ``text`` once, adding {rule position: set(keywords)} hits to ``fired``.
+
+        Scanning stops early once every rule on ``field`` has fired.
+        """
+        fired = {} if fired is None else fired
+        pattern = self._patterns.get(field)
+        if pattern is None or not text:
+            return fired
+        remaining = self._remaining(field, fired)
+        for match in pattern.finditer(text):
+            remaining = self._record(field, match.group(0), fired, remaining)
+            if remaining <= 0:
+                break
+        return fired
+
+    def scanner(self, field, fired=None):
+        """ChunkScanner for feeding ``field``'s text piece by piece."""
+        return ChunkScanner(self, field, {} if fired is None else fired)
+
+    def match(self, fields):
+        """Return [(rule, sorted matched keywords)] in rule-table order for a {field: text} dict."""
+        fired = {}
+        for field, text in fields.items():
+            self.scan(field, text, fired)
+        return self.results(fired)
+
+    def results(self, fired):
+        """[(rule, sorted matched keywords)] in rule-table order for a ``fired`` dict."""
+        return [(self.rules[position], sorted(fired[position])) for position in sorted(fired)]
+
+
+class ChunkScanner:
+    """Incremental RuleIndex.scan over text that arrives in chunks.
+
+    Finds exactly what ``scan`` would find on the concatenated text. A match
+    is only accepted once it starts more than one keyword length before the
+    end of the buffered text, so every regex attempt it depends on (longer
+    alternatives, the trailing word boundary) has seen real characters.
+    Everything after that point is carried into the next chunk together with
+    one character of left context for the leading ``\b``, and scanning
+    resumes where the whole-text scan would have.
+    """
+
+    def __init__(self, index, field, fired):
+        self.index = index
+        self.field = field
+        self.fired = fired
+        self._pattern = index._patterns.get(field)
+        self._keep = index._max_keyword_lengths.get(field, 0)
+        self._carry = ""
+        # Where scanning resumes in _carry; anything before it is context only
+        self._pos = 0
+        self.done = self._pattern is None or index._remaining(field, fired) <= 0
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return
+        buffer = self._carry + chunk
+        limit = len(buffer) - self._keep
+        pos = self._scan(buffer, self._pos, limit)
+        if self.done:
+            self._carry = ""
+        elif limit > 0:
+            start = limit - 1
+            self._carry = buffer[start:]
+            self._pos = max(pos, limit) - start
+        else:
+            self._carry = buffer
+
+    def close(self):
+        """Scan what's left; returns the ``fired`` dict."""
+        if not self.done and self._carry:
+            self._scan(self._carry, self._pos, None)
+        self._carry = ""
+        self.done = True
+        return self.fired
+
+    def _scan(self, buffer, pos, limit):
+        remaining = self.index._remaining(self.field, self.fired)
+        for match in self._pattern.finditer(buffer, pos):
+            if limit is not None and match.start() >= limit:
+                break
+            remaining = self.index._record(self.field, match.group(0), self.fired, remaining)
+            pos = match.end()
+            if remaining <= 0:
+                self.done = True
+                break
+        return pos
+
+
+@lru_cache(maxsize=None)
+def default_index():
+    """RuleIndex for RISK_RULES, compiled on first use so importing stays cheap."""
+    return RuleIndex(RISK_RULES)
@@ -0,0 +1,371 @@
+"""HTTP assessment service for programmatic callers (ticketing, model registry, ...).
+
+    python -m risk_engine.service --port 8080 --workers 8 --max-queue 64
+
+Endpoints:
+
+- ``POST /assess``: one project as JSON; responds with its ``complete_assessment``.
+- ``POST /assess/batch``: NDJSON projects in, NDJSON ``complete_assessment``
+  lines out (streamed with chunked encoding, in input order). Invalid lines,
+  and lines over ``max_body`` bytes, produce ``{"line": n, "error": "..."}`` instead.
+- ``GET /health``: liveness plus current load.
+- ``GET /metrics``: stage histograms in Prometheus format (when RISK_METRICS is on).
+
+Assessments run on a process pool so they use every core. Admission is
+bounded: at most ``workers + max_queue`` requests may be running or waiting
+for a worker, and anything beyond that gets ``429 Too Many Requests``
+straight away instead of queueing without limit. A batch request takes one
+of those slots but submits many chunks, so batch chunks get their own
+bounded share of the pool: at most ``max_batch_chunks`` of them, across all
+batch requests, are queued or running at once, and a batch waits for that
+share rather than growing the backlog single ``/assess`` calls sit behind.
+"""
+
+import argparse
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+from . import metrics
+from .batch import _assess_chunk, assess_project, normalise_project
+
+
+def _assess_one(raw):
+    # Runs in a worker process
+    return json.dumps(assess_project(normalise_project(raw), workflow_id="service_mode"))
+
+
+class AssessmentService(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, workers=None, max_queue=64, batch_chunk_size=32, max_body=10 * 1024 * 1024,
+                 max_batch_chunks=None):
+        super().__init__(address, AssessmentHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.batch_chunk_size = batch_chunk_size
+        self.max_body = max_body
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self.max_batch_chunks = max_batch_chunks or self.workers
+        self._batch_slots = threading.BoundedSemaphore(self.max_batch_chunks)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.batch_chunks = 0
+        # "invalid": requests answered 400 for bad input, not server failures
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0, "invalid": 0}
+
+    def admit(self):
+        """Reserve a slot for one request; False means the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+            self.stats["accepted"] += 1
+        return True
+
+    def release(self, outcome="completed"):
+        with self._lock:
+            self.in_flight -= 1
+            self.stats[outcome] += 1
+        self._slots.release()
+
+    def submit_batch_chunk(self, chunk):
+        """Submit one batch chunk once the batch share of the pool has room."""
+        self._batch_slots.acquire()
+        with self._lock:
+            self.batch_chunks += 1
+        try:
+            future = self.pool.submit(_assess_chunk, chunk, "service_mode")
+        except BaseException:
+            self._batch_chunk_done(None)
+            raise
+        future.add_done_callback(self._batch_chunk_done)
+        return future
+
+    def _batch_chunk_done(self, future):
+        with self._lock:
+            self.batch_chunks -= 1
+        self._batch_slots.release()
+
+    def health(self):
+        with self._lock:
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "batch_chunks": self.batch_chunks,
+                "max_batch_chunks": self.max_batch_chunks,
+                **self.stats,
+            }
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AssessmentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "RiskAssessmentService/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _reject(self):
+        # Drain small bodies so the connection stays usable; large or chunked
+        # bodies aren't worth reading just to refuse them, so close instead.
+        length = int(self.headers.get("Content-Length") or 0)
+        headers = {"Retry-After": "1"}
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower() or length > 64 * 1024:
+            self.close_connection = True
+            headers["Connection"] = "close"
+        else:
+            self.rfile.read(length)
+        self._send_json(429, {"error": "assessment queue is full"}, headers)
+
+    def _discard_body(self):
+        for _ in self._body_lines():
+            pass
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body, size = [], 0
+            for chunk in self._read_chunks():
+                size += len(chunk)
+                if size > self.server.max_body:
+                    self.close_connection = True
+                    raise ValueError("request body too large")
+                body.append(chunk)
+            return b"".join(body)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_body:
+            self.close_connection = True
+            raise ValueError("request body too large")
+        return self.rfile.read(length)
+
+    def _read_chunks(self):
+        while True:
+            size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailer section ends with an empty line
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            # Read large chunks in pieces so a huge declared size isn't one allocation
+            while size > 0:
+                piece = self.rfile.read(min(size, 1024 * 1024))
+                if not piece:
+                    return
+                size -= len(piece)
+                yield piece
+            self.rfile.readline()
+
+    def _body_lines(self):
+        """Yield request body lines without buffering the whole body.
+
+        A line is one project, so it is held to ``max_body`` like a single
+        ``/assess`` request; a longer line is skipped whole and yielded as a
+        ValueError in its place, keeping the numbering of the lines after it.
+        """
+        limit = self.server.max_body
+        too_large = ValueError(f"line too large: over {limit} bytes")
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            pending, skipping = b"", False
+            for chunk in self._read_chunks():
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if skipping or len(line) > limit:
+                        # The first line after an overflow is the oversized line's tail
+                        skipping = False
+                        yield too_large
+                    else:
+                        yield line
+                if len(pending) > limit:
+                    pending, skipping = b"", True
+            if skipping:
+                yield too_large
+            elif pending:
+                yield pending
+            return
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            line = self.rfile.readline(min(remaining, limit + 1))
+            if not line:
+                return
+            remaining -= len(line)
+            if len(line) > limit and not line.endswith(b"\n"):
+                # Discard the rest of the line
+                while remaining > 0 and not line.endswith(b"\n"):
+                    line = self.rfile.readline(min(remaining, 1024 * 1024))
+                    if not line:
+                        return
+                    remaining -= len(line)
+                yield too_large
+                continue
+            yield line
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/health":
+            return self._send_json(200, self.server.health())
+        if path == "/metrics":
+            data = metrics.REGISTRY.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path == "/assess":
+            return self._assess()
+        if path == "/assess/batch":
+            return self._assess_batch()
+        self._discard_body()
+        self._send_json(404, {"error": "not found"})
+
+    def _assess(self):
+        server = self.server
+        if not server.admit():
+            return self._reject()
+        outcome = "failed"
+        try:
+            with metrics.span("service_assess"):
+                try:
+                    raw = json.loads(self._read_body() or b"{}")
+                    if not isinstance(raw, dict):
+                        raise ValueError("expected a JSON object")
+                    # Validate here so bad input never costs a worker round trip
+                    normalise_project(raw)
+                except ValueError as e:
+                    outcome = "invalid"
+                    return self._send_json(400, {"error": str(e)})
+                body = server.pool.submit(_assess_one, raw).result()
+            self._send_json(200, body)
+            outcome = "completed"
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+        finally:
+            server.release(outcome)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _assess_batch(self):
+        server = self.server
+        if not server.admit():
+            return self._reject()
+        outcome = "failed"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            with metrics.span("service_assess_batch"):
+                projects = self._parse_lines()
+                pending = deque()
+                max_pending = server.workers * 2
+                while True:
+                    chunk = list(islice(projects, server.batch_chunk_size))
+                    if chunk:
+                        valid = [item for item in chunk if not isinstance(item[1], Exception)]
+                        invalid = [item for item in chunk if isinstance(item[1], Exception)]
+                        future = server.submit_batch_chunk(valid)
+                        pending.append((future, [line_no for line_no, _ in valid], invalid))
+                    # Keep input order: always flush the oldest chunk first
+                    while pending and (len(pending) >= max_pending or not chunk):
+                        future, line_nos, invalid = pending.popleft()
+                        self._write_results(*future.result(), line_nos, invalid)
+                    if not chunk:
+                        break
+            outcome = "completed"
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            self._write_chunk(json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+        finally:
+            server.release(outcome)
+        # Zero-length chunk terminates the response
+        self._write_chunk(b"")
+
+    def _parse_lines(self):
+        for line_no, line in enumerate(self._body_lines(), 1):
+            if isinstance(line, ValueError):
+                yield line_no, line
+                continue
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+                if not isinstance(raw, dict):
+                    raise ValueError("expected a JSON object")
+                yield line_no, raw
+            except ValueError as e:
+                yield line_no, e
+
+    def _write_results(self, lines, errors, line_nos, invalid):
+        # ``lines`` holds the valid projects that assessed cleanly, in order;
+        # pair them back with their line numbers and interleave the errors.
+        failed = {line_no for line_no, _ in errors}
+        results = list(zip((line_no for line_no in line_nos if line_no not in failed), lines))
+        results.extend(
+            (line_no, json.dumps({"line": line_no, "error": str(error)}))
+            for line_no, error in list(errors) + invalid
+        )
+        out = [line.encode("utf-8") + b"\n" for _, line in sorted(results, key=lambda item: item[0])]
+        if out:
+            self._write_chunk(b"".join(out))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI/ML risk assessment HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=64, help="Requests allowed to wait for a worker")
+    parser.add_argument("--batch-chunk-size", type=int, default=32, help="Projects per worker task in /assess/batch")
+    parser.add_argument("--max-batch-chunks", type=int, default=None,
+                        help="Batch chunks queued or running at once across all batch requests (default: workers)")
+    args = parser.parse_args(argv)
+
+    server = AssessmentService(
+        (args.host, args.port), workers=args.workers, max_queue=args.max_queue,
+        batch_chunk_size=args.batch_chunk_size, max_batch_chunks=args.max_batch_chunks
+    )
+    print(f"Risk assessment service on http://{args.host}:{server.server_address[1]} "
+          f"({server.workers} workers, queue {server.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
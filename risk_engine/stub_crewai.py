@@ -0,0 +1,116 @@
+"""Local stand-in for the CrewAI kickoff/status API, for development and load tests.
+
+    python -m risk_engine.stub_crewai --port 8765 --latency 0.5 --error-rate 0.1
+
+POST /kickoff returns ``{"kickoff_id": ...}`` after ``latency`` seconds (or a
+503 with probability ``error_rate``); GET /status/<id> reports RUNNING until
+``run_time`` seconds after kickoff, then SUCCESS with a canned result.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubCrewAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, error_rate=0.0, run_time=1.0):
+        super().__init__(address, _StubHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.run_time = run_time
+        self.kickoffs = {}
+        self.kickoff_count = 0
+        # For verifying client-side coordination: request start times and peak concurrency
+        self.kickoff_times = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a daemon thread; returns self for chaining."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        server = self.server
+        if self.path.rstrip("/") != "/kickoff":
+            return self._send(404, {"error": "not found"})
+        with server._lock:
+            server.kickoff_times.append(time.monotonic())
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            if random.random() < server.error_rate:
+                return self._send(503, {"error": "stub failure"})
+            kickoff_id = str(uuid.uuid4())
+            with server._lock:
+                server.kickoffs[kickoff_id] = time.monotonic()
+                server.kickoff_count += 1
+            self._send(200, {"kickoff_id": kickoff_id})
+        finally:
+            with server._lock:
+                server.active -= 1
+
+    def do_GET(self):
+        server = self.server
+        if not self.path.startswith("/status/"):
+            return self._send(404, {"error": "not found"})
+        kickoff_id = self.path[len("/status/"):]
+        with server._lock:
+            started = server.kickoffs.get(kickoff_id)
+        if started is None:
+            return self._send(404, {"error": "unknown kickoff_id"})
+        if time.monotonic() - started < server.run_time:
+            return self._send(200, {"state": "RUNNING"})
+        self._send(200, {"state": "SUCCESS", "result": "Stub CrewAI assessment complete"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub CrewAI kickoff/status server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each kickoff responds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of kickoffs answered with 503")
+    parser.add_argument("--run-time", type=float, default=1.0, help="Seconds until a kickoff reports SUCCESS")
+    args = parser.parse_args(argv)
+
+    server = StubCrewAIServer((args.host, args.port), args.latency, args.error_rate, args.run_time)
+    print(f"Stub CrewAI listening on {server.url}/kickoff")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Fail if the CrewAI client misbehaves against a local stub server.
+
+    python tools/check_crewai.py
+    python tools/check_crewai.py --sessions 200 --payloads 20 --rate 5 --burst 2 --max-concurrent 3
+
+Coordination: one ``CrewAIClient`` is driven from many threads at once, as
+the Streamlit sessions of one server share it, against a local
+``StubCrewAIServer``. Sessions submit a few distinct payloads between them.
+The stub must see exactly one kickoff per distinct payload (single flight),
+never more than ``--max-concurrent`` at once, and no faster than the token
+bucket allows.
+
+Resilience: 503s are retried ``retries`` times and then counted by the
+circuit breaker, which opens (no request reaches the stub) and closes
+again after a successful half-open trial. Status polling reaches the
+stub's SUCCESS, gives up at ``poll_timeout``, and runs every completion
+callback on a shared handle even when one of them raises.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine.crewai_client import (  # noqa: E402
+    CIRCUIT_OPEN, HTTP_ERROR, STARTED, CircuitBreaker, CrewAIClient, KickoffHandle
+)
+from risk_engine.stub_crewai import StubCrewAIServer  # noqa: E402
+
+# Scheduling slack allowed when checking the kickoff spacing
+TOLERANCE = 0.05
+
+
+def _payload(name):
+    return {"inputs": {"project_name": name}}
+
+
+def _run_sessions(client, payloads, sessions):
+    """Kick off from ``sessions`` threads released together; return (handles, release time)."""
+    released = []
+    barrier = threading.Barrier(sessions, action=lambda: released.append(time.monotonic()))
+    handles = [None] * sessions
+
+    def session(number):
+        barrier.wait()
+        handles[number] = client.kickoff(payloads[number % len(payloads)])
+        handles[number].wait_kickoff(60)
+
+    threads = [threading.Thread(target=session, args=(number,)) for number in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return handles, released[0]
+
+
+def check_coordination(sessions, payloads, rate, burst, max_concurrent, latency):
+    """Return (summary line, [failure messages])."""
+    stub = StubCrewAIServer(latency=latency, run_time=0).start()
+    client = CrewAIClient(
+        f"{stub.url}/kickoff", "check-token", poll_interval=0,
+        rate_limit=rate, burst=burst, max_concurrent=max_concurrent
+    )
+    payload_list = [_payload(f"Check Project {number}") for number in range(payloads)]
+    try:
+        handles, released = _run_sessions(client, payload_list, sessions)
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+
+    failures = []
+    distinct = {id(handle): handle for handle in handles}.values()
+    if stub.kickoff_count != payloads:
+        failures.append(f"stub saw {stub.kickoff_count} kickoffs for {payloads} distinct payloads")
+    if sum(handle.waiters for handle in distinct) != sessions:
+        failures.append(f"handles count {sum(h.waiters for h in distinct)} waiters for {sessions} sessions")
+    if client.stats()["deduplicated"] != sessions - payloads:
+        failures.append(f"{client.stats()['deduplicated']} kickoffs deduplicated, expected {sessions - payloads}")
+    if stub.max_active > max_concurrent:
+        failures.append(f"{stub.max_active} kickoffs ran at once, cap is {max_concurrent}")
+
+    # Token bucket, full when the sessions start: kickoff i (from 0) can't reach
+    # the stub before (i - burst + 1) / rate seconds after they were released
+    times = sorted(stub.kickoff_times)
+    for position, started in enumerate(times[burst:], burst):
+        earliest = released + (position - burst + 1) / rate
+        if started < earliest - TOLERANCE:
+            failures.append(f"kickoff {position + 1} started {earliest - started:.3f}s before the rate limit allows")
+            break
+    observed = (len(times) - burst) / (times[-1] - times[burst - 1]) if len(times) > burst else 0.0
+
+    summary = (
+        f"{sessions} sessions over {payloads} payloads: {stub.kickoff_count} kickoffs, "
+        f"peak {stub.max_active} concurrent (cap {max_concurrent}), "
+        f"{observed:.1f}/s after the burst (limit {rate:g}/s, burst {burst})"
+    )
+    return summary, failures
+
+
+def check_resilience(retries=2, failure_threshold=3, reset_timeout=0.3):
+    """Retry, circuit breaker and half-open recovery; return (summary line, [failure messages])."""
+    stub = StubCrewAIServer(error_rate=1.0, run_time=0).start()
+    client = CrewAIClient(
+        f"{stub.url}/kickoff", "check-token", retries=retries, backoff_factor=0, poll_interval=0,
+        breaker=CircuitBreaker(failure_threshold, reset_timeout)
+    )
+    failures = []
+    try:
+        outcomes = [client.kickoff(_payload(f"Failing {n}")).wait_kickoff(30) for n in range(failure_threshold)]
+        if [outcome["state"] for outcome in outcomes] != [HTTP_ERROR] * failure_threshold:
+            failures.append(f"503 kickoffs ended as {[outcome['state'] for outcome in outcomes]}")
+        posts = len(stub.kickoff_times)
+        if posts != failure_threshold * (retries + 1):
+            failures.append(f"stub saw {posts} POSTs for {failure_threshold} kickoffs with {retries} retries each")
+        if client.breaker.state != "open":
+            failures.append(f"breaker is {client.breaker.state} after {failure_threshold} failed kickoffs")
+        refused = client.kickoff(_payload("While open")).wait_kickoff(30)
+        if refused["state"] != CIRCUIT_OPEN or len(stub.kickoff_times) != posts:
+            failures.append(f"open breaker let a kickoff through ({refused['state']})")
+
+        stub.error_rate = 0.0
+        time.sleep(reset_timeout)
+        trial = client.kickoff(_payload("Half-open trial")).wait_kickoff(30)
+        if trial["state"] != STARTED or client.breaker.state != "closed":
+            failures.append(f"half-open trial ended {trial['state']}, breaker {client.breaker.state}")
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+    summary = (
+        f"{failure_threshold} failing kickoffs: {posts} POSTs ({retries} retries each), breaker opened, "
+        f"refused the next, closed after the half-open trial"
+    )
+    return summary, failures
+
+
+def check_polling(run_time=0.3, poll_interval=0.05, poll_timeout=0.3):
+    """Status polling to SUCCESS, the poll deadline and callback isolation; return (summary, failures)."""
+    stub = StubCrewAIServer(run_time=run_time).start()
+    client = CrewAIClient(f"{stub.url}/kickoff", "check-token", poll_interval=poll_interval, poll_timeout=10)
+    failures = []
+    stored = []
+
+    def failing(handle):
+        raise RuntimeError("check: failing completion callback")
+
+    errors = io.StringIO()
+    try:
+        handle = client.kickoff(_payload("Polled"))
+        # Two sessions sharing one handle; the first one's callback fails
+        handle.when_status_done(failing)
+        handle.when_status_done(lambda handle: stored.append(handle.snapshot()))
+        with contextlib.redirect_stderr(errors):
+            finished = handle.status_done.wait(run_time + 10)
+        if not finished:
+            failures.append("status polling never finished")
+        elif not stored:
+            failures.append("a failing callback stopped the next callback from running")
+        elif stored[0]["status_state"] != "SUCCESS" or stored[0]["crewai_result"] is None:
+            failures.append(f"polling finished with {stored[0]}")
+        if len(handle.callback_errors) != 1 or "failing completion callback" not in errors.getvalue():
+            failures.append(f"callback errors not reported: {handle.callback_errors!r}")
+
+        # A kickoff that never finishes stops being polled at poll_timeout
+        stub.run_time = 60
+        client.poll_timeout = poll_timeout
+        started = time.monotonic()
+        slow = client.kickoff(_payload("Never finishes"))
+        if not slow.status_done.wait(poll_timeout + 10):
+            failures.append("polling did not stop at poll_timeout")
+        elif slow.snapshot()["status_state"] != "RUNNING":
+            failures.append(f"timed-out polling left status {slow.snapshot()['status_state']}")
+        gave_up = time.monotonic() - started
+    finally:
+        client.close()
+        stub.shutdown()
+        stub.server_close()
+    summary = (
+        f"polling: SUCCESS after {run_time}s with a failing callback isolated; "
+        f"gave up on a stuck kickoff after {gave_up:.2f}s (poll_timeout {poll_timeout}s)"
+    )
+    return summary, failures
+
+
+def check_completed_handle():
+    """Callbacks on an already-finished handle run at once; return (summary, failures)."""
+    handle = KickoffHandle.completed({"workflow_id": "cached", "state": "cached", "status_code": None})
+    called = []
+    handle.when_status_done(called.append)
+    failures = [] if called == [handle] and handle.status_done.is_set() else ["completed handle skipped its callback"]
+    return "completed handle: callback ran immediately", failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub-server check for the CrewAI client")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--payloads", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=4.0, help="Client kickoffs per second")
+    parser.add_argument("--burst", type=int, default=2)
+    parser.add_argument("--max-concurrent", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub kickoff latency in seconds")
+    args = parser.parse_args(argv)
+
+    checks = [
+        lambda: check_coordination(
+            args.sessions, args.payloads, args.rate, args.burst, args.max_concurrent, args.latency
+        ),
+        check_resilience,
+        check_polling,
+        check_completed_handle,
+    ]
+    failed = False
+    for check in checks:
+        summary, failures = check()
+        print(summary)
+        for message in failures:
+            print(f"FAIL: {message}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Fail if importing the assessment engine gets slow or pulls in heavy dependencies.
+
+    python tools/check_import_time.py --budget-ms 10
+
+Each run imports the engine package in a fresh interpreter with
+``-X importtime`` and reads the cumulative time of ``risk_engine``. The
+median over several runs is compared to the budget. The worker/client
+modules are imported too, and the check fails if any of them loaded
+streamlit, requests or numpy as a side effect.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The package itself is imported first so its time is measured in isolation
+MODULES = [
+    "risk_engine",
+    "risk_engine.batch",
+    "risk_engine.cache",
+    "risk_engine.crewai_client",
+]
+FORBIDDEN = ["streamlit", "requests", "numpy"]
+
+PROBE = """
+import sys
+{imports}
+loaded = [name for name in {forbidden!r} if name in sys.modules]
+print(",".join(loaded))
+"""
+
+
+def measure_once(modules):
+    code = PROBE.format(imports="\n".join(f"import {name}" for name in modules), forbidden=FORBIDDEN)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    package_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].rstrip() == " risk_engine":
+            package_us = int(parts[1])
+    return package_us / 1000.0, [name for name in result.stdout.strip().split(",") if name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget check for risk_engine")
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    timings, heavy = [], set()
+    for _ in range(args.runs):
+        elapsed_ms, loaded = measure_once(MODULES)
+        timings.append(elapsed_ms)
+        heavy.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"risk_engine import: median {median:.1f} ms over {args.runs} runs (budget {args.budget_ms:.1f} ms)")
+    failed = False
+    if heavy:
+        print(f"FAIL: importing the engine loaded {', '.join(sorted(heavy))}")
+        failed = True
+    if median > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
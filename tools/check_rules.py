@@ -0,0 +1,156 @@
+"""Fail if the keyword rules break on case-folded text or the chunked scan disagrees with the whole-text one.
+
+    python tools/check_rules.py
+    python tools/check_rules.py --fuzz 10000 --seed 7
+
+``re.IGNORECASE`` matches more spellings than ``str.lower()`` maps back to
+a keyword ("meſſage" matches "message", "Aİ" matches "ai", a Kelvin sign
+matches "k"). Every keyword of RISK_RULES is respelled with such
+characters. The whole-text scan (``analyse_risks``) and the chunked scan
+(``analyse_documents``) must both run without error, report the keyword
+and agree with each other.
+
+The fuzz pass then feeds random texts built from keywords, keyword
+fragments, case-folded letters, punctuation and whitespace to a
+``ChunkScanner`` in random chunk sizes (1-64 characters). For every text
+and field it must find exactly what ``RuleIndex.scan`` finds on the whole
+text, using the real rule table and one with overlapping keywords.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine import RISK_RULES, RuleIndex, analyse_documents, analyse_risks  # noqa: E402
+
+# Hand-picked inputs from bug reports; (description, context, rule id, keyword)
+CASES = [
+    ("meſſage drafts", "", "communication_security", "message"),
+    ("Aİ assistant", "", "ai_ml_ethics", "ai"),
+    ("AI assistant", "", "ai_ml_ethics", "ai"),
+]
+
+
+def fold_alternates(limit=0x3000):
+    """{lowercase ASCII letter: [other characters re.IGNORECASE matches it with]}"""
+    alternates = {}
+    for code in range(128, limit):
+        char = chr(code)
+        for letter in "abcdefghijklmnopqrstuvwxyz":
+            if re.fullmatch(letter, char, re.IGNORECASE):
+                alternates.setdefault(letter, []).append(char)
+    return alternates
+
+
+def respellings(keyword, alternates):
+    """One respelling of ``keyword`` per foldable letter, using each of its alternates."""
+    for position, letter in enumerate(keyword):
+        for char in alternates.get(letter, ()):
+            yield keyword[:position] + char + keyword[position + 1:]
+
+
+def _fired(analysis):
+    return {(fired["rule"], keyword) for fired in analysis["fired_rules"] for keyword in fired["keywords"]}
+
+
+def check(description, context, expected_rule, expected_keyword):
+    """Return a failure message, or None."""
+    try:
+        whole = _fired(analyse_risks(description, context))
+        chunked = _fired(analyse_documents(description, context, chunk_size=3)[0])
+    except Exception as e:
+        return f"{description!r} / {context!r}: {type(e).__name__}: {e}"
+    if (expected_rule, expected_keyword) not in whole:
+        return f"{description!r} / {context!r}: {expected_rule}/{expected_keyword} did not fire"
+    if whole != chunked:
+        return f"{description!r} / {context!r}: chunked scan found {sorted(chunked)}, whole scan {sorted(whole)}"
+    return None
+
+
+# Keywords that are prefixes of each other, on both fields, to stress match boundaries
+OVERLAPPING_RULES = [
+    {"id": "short", "field": "description", "keywords": ["ai", "mail", "data"], "risks": {}},
+    {"id": "long", "field": "description", "keywords": ["aid", "email", "emails", "database"], "risks": {}},
+    {"id": "phrase", "field": "context", "keywords": ["eu ai", "ai act", "data"], "risks": {}},
+    {"id": "single", "field": "context", "keywords": ["k", "s"], "risks": {}},
+]
+SEPARATORS = [" ", "  ", "\n", ".", ",", "-", "_", "/", "'", "1", "é", ""]
+
+
+def random_text(rng, keywords, alternates, max_tokens=120):
+    """Keywords, their fragments and case-folded respellings glued with random separators."""
+    tokens = []
+    for _ in range(rng.randrange(max_tokens)):
+        keyword = rng.choice(keywords)
+        roll = rng.random()
+        if roll < 0.2:
+            keyword = keyword[:rng.randrange(1, len(keyword) + 1)]
+        elif roll < 0.3:
+            keyword = rng.choice(list(respellings(keyword, alternates)) or [keyword])
+        elif roll < 0.4:
+            keyword = keyword.upper()
+        elif roll < 0.5:
+            keyword = rng.choice(("the", "pipeline", "x", "")) + keyword
+        tokens.append(keyword + rng.choice(SEPARATORS))
+    return "".join(tokens)
+
+
+def _chunked_scan(index, field, text, rng):
+    scanner = index.scanner(field)
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 64)
+        scanner.feed(text[position:position + size])
+        position += size
+    return scanner.close()
+
+
+def fuzz(count, seed, alternates):
+    """Compare ChunkScanner with RuleIndex.scan on ``count`` random texts per rule table; return failures."""
+    rng = random.Random(seed)
+    failures = []
+    for rules in (RISK_RULES, OVERLAPPING_RULES):
+        index = RuleIndex(rules)
+        keywords = [keyword.lower() for rule in rules for keyword in rule["keywords"]]
+        for _ in range(count):
+            text = random_text(rng, keywords, alternates)
+            for field in ("description", "context"):
+                whole = index.scan(field, text)
+                chunked = _chunked_scan(index, field, text, rng)
+                if whole != chunked:
+                    failures.append(f"{field} {text[:80]!r}...: chunked {chunked}, whole {whole}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Case-folding and chunked-scan checks for the keyword rules")
+    parser.add_argument("--fuzz", type=int, default=3000, help="Random texts per rule table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    alternates = fold_alternates()
+    cases = list(CASES)
+    for rule in RISK_RULES:
+        for keyword in rule["keywords"]:
+            for spelling in respellings(keyword.lower(), alternates):
+                text = f"Project notes: {spelling} applies."
+                if rule["field"] == "description":
+                    cases.append((text, "", rule["id"], keyword.lower()))
+                else:
+                    cases.append(("", text, rule["id"], keyword.lower()))
+
+    failures = [message for message in (check(*case) for case in cases) if message]
+    print(f"{len(cases)} case-folded inputs checked, {len(failures)} failed")
+    fuzz_failures = fuzz(args.fuzz, args.seed, alternates)
+    print(f"{args.fuzz} random texts x 2 rule tables x 2 fields: chunked scan disagreed {len(fuzz_failures)} times")
+    for message in (failures + fuzz_failures)[:20]:
+        print(f"FAIL: {message}")
+    return 1 if failures or fuzz_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())